@@ -1,2 +1,12 @@
-from .glse import run
 from ._version import __version__
+
+__all__ = ["__version__", "run"]
+
+
+def __getattr__(name):
+    # The GUI imports Qt, matplotlib and GraphingLib, which take seconds
+    if name == "run":
+        from .glse import run
+
+        return run
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
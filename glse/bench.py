@@ -0,0 +1,442 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from .metrics import percentile
+
+BENCH_VERSION = 1
+WIDGET_TYPES = (
+    "Slider",
+    "Dropdown",
+    "ColorPickerWidget",
+    "CheckBox",
+    "TableWidget",
+    "ColorCycleWidget",
+    "TupleWidget",
+)
+STARTUP_STAGES = ("import", "import_gui", "first_window", "first_render")
+# Run in a new interpreter, glse must not be imported before the clock starts
+STARTUP_SCRIPT = (
+    "import time; started = time.perf_counter(); import glse; "
+    "from glse.bench import measure_startup; measure_startup(started)"
+)
+# rcParam edited through the table, every figure with data depends on it
+TABLE_KEY = "axes.xmargin"
+
+
+def other_color(color: str) -> str:
+    return "#123456" if color.lower() != "#123456" else "#654321"
+
+
+def slider_changes(widget):
+    slider = widget.slider
+    initial = slider.value()
+    other = initial + 1 if initial < slider.maximum() else initial - 1
+    return [lambda: slider.setValue(other), lambda: slider.setValue(initial)]
+
+
+def dropdown_changes(widget):
+    dropdown = widget.dropdown
+    initial = dropdown.currentIndex()
+    other = (initial + 1) % dropdown.count()
+    return [
+        lambda: dropdown.setCurrentIndex(other),
+        lambda: dropdown.setCurrentIndex(initial),
+    ]
+
+
+def color_picker_changes(widget):
+    edit = widget.colorEdit
+    initial = edit.text()
+    other = other_color(initial)
+    return [lambda: edit.setText(other), lambda: edit.setText(initial)]
+
+
+def checkbox_changes(widget):
+    checkbox = widget.checkbox
+    return [lambda: checkbox.setChecked(not checkbox.isChecked())]
+
+
+def table_changes(widget):
+    table = widget.table
+    rows = [
+        row
+        for row in range(table.rowCount())
+        if table.item(row, 0) is not None and table.item(row, 0).text() == TABLE_KEY
+    ]
+    if rows:
+        row = rows[0]
+    else:
+        widget.addRow()
+        row = table.rowCount() - 1
+        table.item(row, 1).setText("0.05")
+        table.item(row, 0).setText(TABLE_KEY)
+    value = table.item(row, 1)
+    initial = value.text()
+    other = "0.1" if initial != "0.1" else "0.05"
+    return [lambda: value.setText(other), lambda: value.setText(initial)]
+
+
+def color_cycle_changes(widget):
+    edit = widget.color_widgets[0].colorEdit
+    initial = edit.text()
+    other = other_color(initial)
+    return [lambda: edit.setText(other), lambda: edit.setText(initial)]
+
+
+def tuple_changes(widget):
+    edit = widget.line_edits[0]
+    initial = edit.text()
+    try:
+        other = str(float(initial) + 0.5)
+    except ValueError:
+        other = "6.5"
+    return [lambda: edit.setText(other), lambda: edit.setText(initial)]
+
+
+CHANGES = {
+    "Slider": slider_changes,
+    "Dropdown": dropdown_changes,
+    "ColorPickerWidget": color_picker_changes,
+    "CheckBox": checkbox_changes,
+    "TableWidget": table_changes,
+    "ColorCycleWidget": color_cycle_changes,
+    "TupleWidget": tuple_changes,
+}
+
+
+def find_widget(window, widget_type: str):
+    """
+    Return the first enabled widget of a type, from the Figure tab if it has
+    one since its parameters apply to every figure.
+    """
+    from . import widgets
+
+    cls = getattr(widgets, widget_type)
+    for parent in (window.figureTab, window):
+        for widget in parent.findChildren(cls):
+            if widget.isEnabled():
+                return widget
+    raise LookupError(f"No enabled {widget_type} in the window")
+
+
+class LatencyProbe:
+    """
+    Measures the time from a parameter change to the first preview showing
+    it, or to the end of the update when the figure does not depend on the
+    changed parameter.
+    """
+
+    def __init__(self, app, window, timeout: float = 120.0):
+        from PySide6.QtCore import QTimer
+
+        self.app = app
+        self.window = window
+        self.timeout = timeout
+        self.first_swap = None
+        window.canvas.preview.swapped.connect(self.on_swapped)
+        # Wakes the event loop up regularly while waiting
+        self.tick = QTimer()
+        self.tick.setInterval(20)
+        self.tick.start()
+
+    def on_swapped(self, duration):
+        if self.first_swap is None:
+            self.first_swap = time.perf_counter()
+
+    def is_idle(self) -> bool:
+        canvas = self.window.canvas
+        return (
+            not self.window.render_scheduler.has_pending
+            and canvas.displayed_generation == canvas.generation
+            and not canvas.refine_timer.isActive()
+            and not canvas.resize_timer.isActive()
+            and canvas.preview.swap_start is None
+        )
+
+    def wait_idle(self):
+        from PySide6.QtCore import QEventLoop
+
+        deadline = time.perf_counter() + self.timeout
+        self.app.processEvents()
+        while not self.is_idle():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("The preview did not update in time")
+            self.app.processEvents(QEventLoop.WaitForMoreEvents)
+
+    def measure(self, change) -> tuple[float, bool]:
+        """
+        Return the latency of ``change`` in seconds and whether the figure
+        was rendered again.
+        """
+        self.wait_idle()
+        generation = self.window.canvas.generation
+        self.first_swap = None
+        start = time.perf_counter()
+        change()
+        self.wait_idle()
+        end = self.first_swap if self.first_swap is not None else time.perf_counter()
+        return end - start, self.window.canvas.generation != generation
+
+
+def summarize(samples: list[float], renders: int | None = None) -> dict:
+    milliseconds = [sample * 1000 for sample in samples]
+    summary = {"count": len(milliseconds)}
+    if renders is not None:
+        summary["renders"] = renders
+    return summary | {
+        "mean": round(sum(milliseconds) / len(milliseconds), 3),
+        "p50": round(percentile(milliseconds, 0.5), 3),
+        "p90": round(percentile(milliseconds, 0.9), 3),
+        "p95": round(percentile(milliseconds, 0.95), 3),
+        "p99": round(percentile(milliseconds, 0.99), 3),
+        "max": round(max(milliseconds), 3),
+    }
+
+
+def environment() -> dict:
+    import graphinglib as gl
+    import matplotlib
+    import PySide6
+
+    from ._version import __version__
+
+    return {
+        "glse": __version__,
+        "graphinglib": gl.__version__,
+        "matplotlib": matplotlib.__version__,
+        "pyside6": PySide6.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt_platform": os.environ.get("QT_QPA_PLATFORM", ""),
+    }
+
+
+def run_benchmarks(
+    iterations: int = 20,
+    figures: list[str] | None = None,
+    widget_types: list[str] | None = None,
+    warmup: int = 2,
+    log=None,
+) -> dict:
+    """
+    Drive one widget of each type against each built-in figure in a
+    headless window and return the latency percentiles in milliseconds,
+    keyed by widget type then figure name. Previews are never cached, every
+    change that affects the figure is rendered.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    from .glse import MainWindow
+    from .preview_cache import PreviewCache
+
+    app = QApplication.instance() or QApplication([])
+    # Some widgets print their values, keep stdout for the results
+    with redirect_stdout(sys.stderr):
+        window = MainWindow()
+        canvas = window.canvas
+        canvas.preview_cache = PreviewCache(0)
+        canvas.thumbnail_timer.timeout.disconnect(canvas.render_thumbnails)
+        window.show()
+        probe = LatencyProbe(app, window)
+        names = [
+            name
+            for name, filename in canvas.example_figs_dict.items()
+            if filename.endswith(".py")
+        ]
+        unknown = set(figures or []) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown figures: {', '.join(sorted(unknown))}")
+        figures = figures or sorted(names)
+        widget_types = widget_types or list(WIDGET_TYPES)
+
+        results = {}
+        try:
+            for widget_type in widget_types:
+                widget = find_widget(window, widget_type)
+                changes = CHANGES[widget_type](widget)
+                results[widget_type] = {}
+                for figure in figures:
+                    canvas.exampleFigures.setCurrentRow(names.index(figure))
+                    for step in range(warmup):
+                        probe.measure(changes[step % len(changes)])
+                    samples = []
+                    renders = 0
+                    for step in range(iterations):
+                        latency, rendered = probe.measure(
+                            changes[step % len(changes)]
+                        )
+                        samples.append(latency)
+                        renders += rendered
+                    results[widget_type][figure] = summarize(samples, renders)
+                    if log is not None:
+                        summary = results[widget_type][figure]
+                        log(
+                            f"{widget_type:<18} {figure:<18} "
+                            f"p50 {summary['p50']:8.1f} ms  "
+                            f"p95 {summary['p95']:8.1f} ms  "
+                            f"renders {renders}/{iterations}"
+                        )
+        finally:
+            probe.tick.stop()
+            canvas.shutdown()
+            window.deleteLater()
+
+    return {
+        "version": BENCH_VERSION,
+        "unit": "ms",
+        "iterations": iterations,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def measure_startup(started: float):
+    """
+    Print the time from ``started``, taken before importing glse, to the
+    package and the GUI being imported, the window being shown and the first
+    preview being painted.
+    """
+    imported = time.perf_counter()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QEvent, QEventLoop, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from .glse import create_window
+
+    gui_imported = time.perf_counter()
+
+    class FirstPaint(QObject):
+        def __init__(self):
+            super().__init__()
+            self.time = None
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and self.time is None:
+                self.time = time.perf_counter()
+            return False
+
+    app = QApplication([])
+    with redirect_stdout(sys.stderr):
+        window = create_window(app)
+        painted = FirstPaint()
+        window.installEventFilter(painted)
+        rendered = []
+        window.canvas.preview.swapped.connect(
+            lambda duration: rendered.append(time.perf_counter())
+        )
+        window.show()
+        tick = QTimer()
+        tick.setInterval(20)
+        tick.start()
+        deadline = time.perf_counter() + 120
+        while not rendered and time.perf_counter() < deadline:
+            app.processEvents(QEventLoop.WaitForMoreEvents)
+        window.canvas.shutdown()
+    if not rendered or painted.time is None:
+        raise TimeoutError("The first preview was not painted in time")
+    timings = {
+        "import": imported - started,
+        "import_gui": gui_imported - started,
+        "first_window": painted.time - started,
+        "first_render": rendered[0] - started,
+    }
+    print(json.dumps(timings))
+
+
+def run_startup_benchmark(runs: int = 5, log=None) -> dict:
+    """
+    Start the GUI ``runs`` times in new processes with empty caches and
+    return the percentiles of each startup stage in milliseconds.
+    """
+    from .profiling import PROFILE_ENV
+
+    samples = {stage: [] for stage in STARTUP_STAGES}
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, GLSE_CACHE_DIR=directory)
+            env.setdefault("QT_QPA_PLATFORM", "offscreen")
+            env.pop(PROFILE_ENV, None)
+            process = subprocess.run(
+                [sys.executable, "-c", STARTUP_SCRIPT],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        if process.returncode != 0:
+            raise RuntimeError(f"The startup benchmark failed:\n{process.stderr}")
+        timings = json.loads(process.stdout.strip().splitlines()[-1])
+        for stage in STARTUP_STAGES:
+            samples[stage].append(timings[stage])
+        if log is not None:
+            log(
+                "startup            "
+                + "  ".join(
+                    f"{stage} {timings[stage] * 1000:.0f} ms"
+                    for stage in STARTUP_STAGES
+                )
+            )
+    return {stage: summarize(samples[stage]) for stage in STARTUP_STAGES}
+
+
+def measurements(results: dict):
+    for widget_type, figures in results.get("results", {}).items():
+        for figure, summary in figures.items():
+            yield f"{widget_type} on {figure}", summary
+    for stage, summary in results.get("startup", {}).items():
+        yield f"startup {stage}", summary
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float = 0.2,
+    min_delta: float = 1.0,
+    metrics=("p50", "p95"),
+) -> list[dict]:
+    """
+    Return the measurements, widget and figure pairs or startup stages,
+    whose latency grew by more than ``tolerance`` (a fraction) and
+    ``min_delta`` milliseconds compared to the baseline. Measurements
+    missing from either are ignored.
+    """
+    references = dict(measurements(baseline))
+    regressions = []
+    for name, summary in measurements(results):
+        reference = references.get(name)
+        if reference is None:
+            continue
+        for metric in metrics:
+            current, previous = summary[metric], reference[metric]
+            if current > previous * (1 + tolerance) and current - previous > min_delta:
+                regressions.append(
+                    {
+                        "name": name,
+                        "metric": metric,
+                        "baseline": previous,
+                        "current": current,
+                    }
+                )
+    return regressions
+
+
+def load_results(filepath: str) -> dict | None:
+    try:
+        with open(filepath) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def write_results(filepath: str, results: dict):
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    with open(filepath, "w") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
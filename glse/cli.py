@@ -1,5 +1,213 @@
-from .glse import run
+import argparse
+import json
+import os
+import sys
+import time
 
+from .paths import cache_dir
 
-def main():
-    run()
+UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper().removesuffix("B")
+    unit = text[-1:] if text[-1:] in UNITS else ""
+    try:
+        return int(float(text[: len(text) - len(unit)]) * UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}")
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def render_cache():
+    from .render_cache import DiskRenderCache
+
+    return DiskRenderCache(cache_dir("renders"))
+
+
+def cache_info(args):
+    stats = render_cache().stats()
+    print(f"Directory:  {stats['directory']}")
+    print(f"Entries:    {stats['entries']}")
+    print(f"Size:       {format_size(stats['bytes'])}")
+    print(f"Limit:      {format_size(stats['max_bytes'])}")
+    if stats["entries"]:
+        for label, key in (("Oldest", "oldest_access"), ("Newest", "newest_access")):
+            accessed = time.strftime("%Y-%m-%d %H:%M", time.localtime(stats[key]))
+            print(f"{label} use: {accessed}")
+
+
+def cache_prune(args):
+    cache = render_cache()
+    max_age = args.older_than * 86400 if args.older_than is not None else None
+    freed = cache.prune(max_bytes=args.max_size, max_age=max_age)
+    print(f"Freed {format_size(freed)}, {format_size(cache.nbytes)} left")
+
+
+def cache_clear(args):
+    freed = render_cache().clear()
+    print(f"Freed {format_size(freed)}")
+
+
+def bench(args):
+    from .bench import (
+        BENCH_VERSION,
+        compare,
+        environment,
+        load_results,
+        run_benchmarks,
+        run_startup_benchmark,
+        write_results,
+    )
+
+    def log(line):
+        print(line, file=sys.stderr)
+
+    if args.startup_only:
+        results = {
+            "version": BENCH_VERSION,
+            "unit": "ms",
+            "environment": environment(),
+            "results": {},
+        }
+    else:
+        results = run_benchmarks(
+            iterations=args.iterations,
+            figures=args.figure,
+            widget_types=args.widget,
+            warmup=args.warmup,
+            log=log,
+        )
+    if args.startup_runs > 0:
+        results["startup"] = run_startup_benchmark(args.startup_runs, log=log)
+    if args.output:
+        write_results(args.output, results)
+    else:
+        print(json.dumps(results, indent=2))
+
+    baseline_path = args.baseline or os.path.join(cache_dir("bench"), "baseline.json")
+    if args.save_baseline:
+        write_results(baseline_path, results)
+        log(f"Baseline written to {baseline_path}")
+        return
+    baseline = load_results(baseline_path)
+    if baseline is None:
+        log(f"No baseline at {baseline_path}, run with --save-baseline to store one")
+        return
+    regressions = compare(results, baseline, tolerance=args.tolerance / 100)
+    for regression in regressions:
+        log(
+            "Regression: {name}, {metric} {baseline:.1f} ms -> "
+            "{current:.1f} ms".format(**regression)
+        )
+    if regressions:
+        sys.exit(1)
+    log(f"No regression compared to {baseline_path}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="glse", description="A GUI editor for GraphingLib style files"
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    cache = commands.add_parser("cache", help="inspect and prune the render cache")
+    cache.set_defaults(func=cache_info)
+    cache_commands = cache.add_subparsers()
+    info = cache_commands.add_parser("info", help="show the size of the cache")
+    info.set_defaults(func=cache_info)
+    prune = cache_commands.add_parser(
+        "prune", help="remove the least recently used renders"
+    )
+    prune.add_argument(
+        "--max-size",
+        type=parse_size,
+        default=None,
+        help="size to shrink the cache to, e.g. 200M (default: the cache limit)",
+    )
+    prune.add_argument(
+        "--older-than",
+        type=float,
+        default=None,
+        metavar="DAYS",
+        help="also remove renders not used for this many days",
+    )
+    prune.set_defaults(func=cache_prune)
+    clear = cache_commands.add_parser("clear", help="remove every cached render")
+    clear.set_defaults(func=cache_clear)
+
+    from .bench import WIDGET_TYPES
+
+    bench_parser = commands.add_parser(
+        "bench",
+        help="measure the latency of every widget type against every built-in figure",
+    )
+    bench_parser.add_argument(
+        "--iterations", type=int, default=20, help="changes measured per pair"
+    )
+    bench_parser.add_argument(
+        "--warmup", type=int, default=2, help="changes ignored before measuring"
+    )
+    bench_parser.add_argument(
+        "--figure",
+        action="append",
+        metavar="NAME",
+        help="only this built-in figure, can be repeated (default: all)",
+    )
+    bench_parser.add_argument(
+        "--widget",
+        action="append",
+        choices=WIDGET_TYPES,
+        help="only this widget type, can be repeated (default: all)",
+    )
+    bench_parser.add_argument(
+        "--startup-runs",
+        type=int,
+        default=5,
+        metavar="N",
+        help="times the GUI is started to measure its startup, 0 to skip (default: 5)",
+    )
+    bench_parser.add_argument(
+        "--startup-only",
+        action="store_true",
+        help="only measure the startup, not the widgets",
+    )
+    bench_parser.add_argument(
+        "--output", metavar="FILE", help="write the results there instead of stdout"
+    )
+    bench_parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="results to compare against (default: baseline.json in the cache)",
+    )
+    bench_parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the baseline instead of comparing them",
+    )
+    bench_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=20,
+        metavar="PERCENT",
+        help="slowdown reported as a regression (default: 20)",
+    )
+    bench_parser.set_defaults(func=bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from .glse import run
+
+        run()
+    else:
+        args.func(args)
@@ -0,0 +1,93 @@
+import hashlib
+import marshal
+import os
+import tempfile
+from importlib.util import MAGIC_NUMBER
+
+
+class CodeCache:
+    """
+    Cache of compiled figure scripts keyed by path, modification time and size.
+
+    Scripts larger than ``disk_threshold`` bytes also have their bytecode stored
+    in ``disk_cache_dir`` (if given) so that they don't need to be recompiled in
+    later sessions.
+    """
+
+    def __init__(self, disk_cache_dir: str | None = None, disk_threshold=64 * 1024):
+        self.disk_cache_dir = disk_cache_dir
+        self.disk_threshold = disk_threshold
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filepath: str):
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self.entries.get(filepath)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+
+        use_disk = (
+            self.disk_cache_dir is not None and stat.st_size >= self.disk_threshold
+        )
+        code = self._load_from_disk(filepath, key) if use_disk else None
+        if code is None:
+            with open(filepath) as file:
+                code = compile(file.read(), filepath, "exec")
+            if use_disk:
+                self._store_on_disk(filepath, key, code)
+
+        self.entries[filepath] = (key, code)
+        return code
+
+    def invalidate(self, filepath: str | None = None):
+        if filepath is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(os.path.abspath(filepath), None)
+
+    def _disk_path(self, filepath: str) -> str:
+        digest = hashlib.sha1(filepath.encode()).hexdigest()
+        return os.path.join(self.disk_cache_dir, digest + ".pyc")
+
+    def _header(self, key) -> bytes:
+        mtime_ns, size = key
+        return MAGIC_NUMBER + mtime_ns.to_bytes(8, "little") + size.to_bytes(8, "little")
+
+    def _load_from_disk(self, filepath: str, key):
+        header = self._header(key)
+        try:
+            with open(self._disk_path(filepath), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        if not data.startswith(header):
+            return None
+        try:
+            return marshal.loads(data[len(header) :])
+        except (EOFError, ValueError, TypeError):
+            return None
+
+    def _store_on_disk(self, filepath: str, key, code):
+        tmp_path = None
+        try:
+            os.makedirs(self.disk_cache_dir, exist_ok=True)
+            # Write to a temporary file first so that concurrent readers never
+            # see a partially written file
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(self._header(key))
+                file.write(marshal.dumps(code))
+            os.replace(tmp_path, self._disk_path(filepath))
+        except OSError:
+            # The on-disk store is only an optimization
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -0,0 +1,77 @@
+class FigureDependencies:
+    """
+    Style parameters a GraphingLib figure depends on. Elements only read the
+    parameters of their own section, and only for the attributes left to
+    "default" by the script.
+    """
+
+    def __init__(self, parameters: dict | None, rc_overrides: set):
+        # section -> keys, None when the dependencies are unknown
+        self.parameters = parameters
+        # rc parameters set by the script itself
+        self.rc_overrides = rc_overrides
+
+    def affected_by(self, section: str, key: str) -> bool:
+        if self.parameters is None:
+            return True
+        if section == "rc_params":
+            return key not in self.rc_overrides
+        return key in self.parameters.get(section, ())
+
+    def to_json(self) -> dict:
+        parameters = None
+        if self.parameters is not None:
+            parameters = {
+                section: sorted(keys) for section, keys in self.parameters.items()
+            }
+        return {"parameters": parameters, "rc_overrides": sorted(self.rc_overrides)}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "FigureDependencies":
+        parameters = data["parameters"]
+        if parameters is not None:
+            parameters = {section: set(keys) for section, keys in parameters.items()}
+        return cls(parameters, set(data["rc_overrides"]))
+
+
+def figure_dependencies(gl_figure) -> FigureDependencies:
+    import graphinglib as gl
+
+    if not isinstance(gl_figure, gl.Figure):
+        # MultiFigures load their style themselves, assume everything matters
+        return FigureDependencies(None, set())
+
+    elements = list(gl_figure._elements)
+    for twin_axis in (gl_figure._twin_x_axis, gl_figure._twin_y_axis):
+        if twin_axis is not None:
+            elements += twin_axis._elements
+
+    parameters = {}
+    for element in [gl_figure] + elements:
+        keys = parameters.setdefault(type(element).__name__, set())
+        for attribute, value in vars(element).items():
+            if isinstance(value, str) and value == "default":
+                keys.add(attribute)
+    rc_overrides = set(gl_figure._rc_dict) | set(gl_figure._user_rc_dict)
+    return FigureDependencies(parameters, rc_overrides)
+
+
+class DependencyIndex:
+    """
+    Maps style parameters to the figures they can affect. Figures are
+    identified by ``(filepath, name)`` and are added as they are rendered,
+    figures that were never rendered are assumed to depend on everything.
+    """
+
+    def __init__(self):
+        self.figures = {}
+
+    def update(self, filepath: str, dependencies: dict):
+        for name, figure_dependencies in dependencies.items():
+            self.figures[(filepath, name)] = figure_dependencies
+
+    def affects(self, figure, changes) -> bool:
+        dependencies = self.figures.get(figure)
+        if dependencies is None:
+            return True
+        return any(dependencies.affected_by(section, key) for section, key in changes)
@@ -11,6 +11,7 @@ from .widgets import (
     Slider,
     TableWidget,
     TupleWidget,
+    cycle_colors,
 )
 
 
@@ -146,6 +147,7 @@ def create_figure_tab(window: QMainWindow):
             if window.params["rc_params"]["legend.edgecolor"] != "none"
             else "#000000"
         ),
+        fallback_color="#000000",
     )
 
     legend_edge_color_activator = Activator(
@@ -255,14 +257,10 @@ def create_figure_tab(window: QMainWindow):
     color_cycle_line.setFrameShadow(QFrame.Sunken)
     figureTabLayout.addWidget(color_cycle_line)
 
-    cycle_string = window.params["rc_params"]["axes.prop_cycle"]
-    initial_colors = (
-        cycle_string.split("[")[1].split("]")[0].replace("'", "").split(", ")
-    )
     color_cycle_widget = ColorCycleWidget(
         window,
         label="Pick colors for color cycle:",
-        initial_colors=initial_colors,
+        initial_colors=cycle_colors(window.params["rc_params"]["axes.prop_cycle"]),
     )
     figureTabLayout.addWidget(color_cycle_widget)
 
@@ -290,6 +288,4 @@ def create_figure_tab(window: QMainWindow):
 
 
 def axes_grid_on_clicked(window, state):
-    rc = {"axes.grid": True if state == 2 else False}
-    window.params["rc_params"].update(rc)
-    window.updateFigure()
+    window.update_params("rc_params", "axes.grid", True if state == 2 else False)
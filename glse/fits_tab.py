@@ -41,6 +41,7 @@ def create_fits_tab(window):
             ["_color"],
         ],
         activated_on_init=window.params["FitFromPolynomial"]["_color"] is not None,
+        fallback_color="#000000",
     )
     activator = Activator(
         window,
@@ -142,6 +143,7 @@ def create_fits_tab(window):
             ["_res_color"],
         ],
         activated_on_init=window.params["FitFromPolynomial"]["_res_color"] is not None,
+        fallback_color="#000000",
     )
     res_activator = Activator(
         window,
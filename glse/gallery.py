@@ -0,0 +1,199 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+from PySide6.QtWidgets import QGridLayout, QLabel, QScrollArea, QVBoxLayout, QWidget
+
+from .dependencies import DependencyIndex
+from .preview import PreviewWidget
+from .preview_cache import PreviewCache
+from .rendering import RenderRequest
+from .restyle import changed_params
+from .sandbox import SandboxPool
+
+
+class GalleryRenderer(QObject):
+    """
+    Renders batches of figures in parallel on a pool of processes, in the
+    order they are given. Requests of a batch that is replaced before they
+    start are dropped.
+    """
+
+    finished = Signal(object)
+
+    def __init__(self, processes: int | None = None):
+        super().__init__()
+        processes = processes or os.cpu_count() or 1
+        # The built-in figures are trusted, no limits are needed
+        self.pool = SandboxPool(processes, cpu_time_limit=None, memory_limit=None)
+        self.executor = ThreadPoolExecutor(processes, thread_name_prefix="gallery")
+        self.generation = 0
+
+    def render(self, requests: list[RenderRequest]):
+        self.generation += 1
+        for request in requests:
+            request.generation = self.generation
+            self.executor.submit(self._render, request)
+
+    def _render(self, request: RenderRequest):
+        if request.generation != self.generation:
+            return
+        # Delivered to the GUI thread through a queued connection
+        self.finished.emit(self.pool.render(request))
+
+    def shutdown(self):
+        self.generation += 1
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pool.shutdown()
+
+
+class GalleryTile(QWidget):
+    clicked = Signal(str)
+
+    def __init__(self, filepath: str, parent=None):
+        super().__init__(parent)
+        self.filepath = os.path.abspath(filepath)
+        self.label = QLabel(os.path.splitext(os.path.basename(filepath))[0])
+        self.label.setAlignment(Qt.AlignCenter)
+        self.preview = PreviewWidget()
+        self.preview.setMinimumSize(240, 180)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addWidget(self.label)
+        layout.addWidget(self.preview)
+        self.setLayout(layout)
+        # Parameters and size of the preview on display
+        self.params = None
+        self.rendered_size = None
+        self.generation = 0
+
+    def set_focused(self, focused: bool):
+        font = self.label.font()
+        font.setBold(focused)
+        self.label.setFont(font)
+
+    def is_current(self, params: dict, dependencies: DependencyIndex) -> bool:
+        if self.params is None or self.rendered_size != self.preview.pixel_size():
+            return False
+        changes = changed_params(self.params, params)
+        if not changes:
+            return True
+        figures = [
+            figure for figure in dependencies.figures if figure[0] == self.filepath
+        ]
+        # Figures that were never rendered are assumed to depend on everything
+        return bool(figures) and not any(
+            dependencies.affects(figure, changes) for figure in figures
+        )
+
+    def mousePressEvent(self, event):
+        self.clicked.emit(self.filepath)
+        super().mousePressEvent(event)
+
+
+class GalleryWidget(QScrollArea):
+    """
+    Grid of previews of every built-in figure, rendered in parallel. The
+    focused tile is rendered first, the others follow as processes become
+    available.
+    """
+
+    tileClicked = Signal(str)
+
+    def __init__(
+        self,
+        filepaths: list[str],
+        dependencies: DependencyIndex,
+        cache: PreviewCache | None = None,
+        columns: int = 4,
+        processes: int | None = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.dependencies = dependencies
+        self.cache = cache
+        self.params = None
+        self.focused = None
+        self.renderer = GalleryRenderer(processes)
+        self.renderer.finished.connect(self.on_render_finished)
+
+        # Render the tiles at their new size once they stop being resized
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(100)
+        self.resize_timer.timeout.connect(self.render_tiles)
+
+        self.tiles = {}
+        grid = QGridLayout()
+        for index, filepath in enumerate(filepaths):
+            tile = GalleryTile(filepath)
+            tile.clicked.connect(self.tileClicked)
+            tile.preview.resized.connect(self.resize_timer.start)
+            grid.addWidget(tile, index // columns, index % columns)
+            self.tiles[tile.filepath] = tile
+        content = QWidget()
+        content.setLayout(grid)
+        self.setWidget(content)
+        self.setWidgetResizable(True)
+
+    def set_focus(self, filepath: str | None):
+        if filepath is not None:
+            filepath = os.path.abspath(filepath)
+        self.focused = filepath
+        for tile_path, tile in self.tiles.items():
+            tile.set_focused(tile_path == filepath)
+
+    def set_params(self, params: dict):
+        self.params = params
+        self.render_tiles()
+
+    def render_tiles(self):
+        if self.params is None or not self.isVisible():
+            return
+        params = self.params
+        # The focused tile first, the others in grid order
+        tiles = sorted(
+            self.tiles.values(), key=lambda tile: tile.filepath != self.focused
+        )
+        requests = []
+        for tile in tiles:
+            if tile.is_current(params, self.dependencies):
+                continue
+            width, height = tile.preview.pixel_size()
+            request = RenderRequest(
+                0,
+                tile.filepath,
+                None,
+                params,
+                width,
+                height,
+                tile.preview.devicePixelRatioF(),
+            )
+            cached = self.cache.get(request) if self.cache is not None else None
+            if cached is not None:
+                self.show_result(tile, cached)
+            else:
+                requests.append(request)
+        if requests:
+            self.renderer.render(requests)
+
+    def on_render_finished(self, result):
+        tile = self.tiles.get(result.request.filepath)
+        if tile is None or result.generation < tile.generation:
+            return
+        tile.generation = result.generation
+        self.dependencies.update(result.request.filepath, result.dependencies)
+        if result.ok:
+            if self.cache is not None:
+                self.cache.put(result)
+            self.show_result(tile, result)
+        elif result.error:
+            tile.preview.set_error(result.error)
+
+    def show_result(self, tile: GalleryTile, result):
+        tile.preview.set_result(result)
+        tile.params = result.request.params
+        tile.rendered_size = (result.request.width, result.request.height)
+
+    def shutdown(self):
+        self.renderer.shutdown()
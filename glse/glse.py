@@ -1,12 +1,10 @@
 import os
 import sys
+from contextlib import contextmanager
 
 import graphinglib as gl
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import close
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QCloseEvent, QKeySequence, QShortcut
+from PySide6.QtCore import QSize, Qt, QTimer, Signal
+from PySide6.QtGui import QCloseEvent, QIcon, QImage, QKeySequence, QPixmap, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
     QCheckBox,
@@ -21,32 +19,51 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QPushButton,
     QComboBox,
-    QScrollArea,
     QSplitter,
     QTabWidget,
     QVBoxLayout,
     QWidget,
     QSpacerItem,
+    QSizePolicy,
 )
-from qt_material import apply_stylesheet
 
+from . import profiling
+from .code_cache import CodeCache
+from .dependencies import DependencyIndex
 from .figure_tab import create_figure_tab
 from .fits_tab import create_fits_tab
+from .history import ParamHistory
+from .metrics import RENDER_AUDIT_ENV, RenderAudit, RenderMetrics, print_renders
 from .other_gl_tab import create_other_gl_tab
+from .param_store import ParamStore
+from .paths import cache_dir
 from .plotting_1d_tab import create_plotting_1d_tab
 from .plotting_2d_tab import create_plotting_2d_tab
+from .preview import PreviewWidget, RenderThread
+from .preview_cache import PreviewCache
+from .render_cache import DiskRenderCache
+from .rendering import FigureRenderer, RenderError, RenderRequest
+from .scheduler import RenderScheduler
 from .shapes_tab import create_shapes_tab
-from .widgets import IndicatorListWidget, IconLabel
-
-
-class GLCanvas(FigureCanvas):
-    def __init__(self, fig):
-        self.fig = fig
-        super(GLCanvas, self).__init__(self.fig)
+from .thumbnails import ThumbnailRenderer
+from .widgets import IndicatorListWidget, IconLabel, LazyTab, WidgetRegistry
 
 
 class FigureManager(QWidget):
-    def __init__(self, params: dict, which_figure: str = "figure"):
+    renderFinished = Signal(object)
+
+    def __init__(
+        self,
+        params: dict,
+        which_figure: str = "figure",
+        refine_delay: int = 300,
+        frame_budget: float = 1 / 30,
+        preview_cache_size: int = 256 * 1024**2,
+        disk_cache_size: int = 512 * 1024**2,
+        thumbnail_delay: int = 1000,
+        thumbnail_width: int = 160,
+        history: ParamHistory | None = None,
+    ):
         super().__init__()
         self.layout = QVBoxLayout()
 
@@ -68,12 +85,29 @@ class FigureManager(QWidget):
         self.exampleFigures.setFixedWidth(200)
         self.exampleFigures.setMinimumHeight(150)
         self.exampleFigures.setMaximumHeight(300)
+        self.exampleFigures.setIconSize(QSize(48, 36))
 
         # Add auto switch checkbox
         self.autoSwitchCheckbox = QCheckBox("Auto Switch")
         self.autoSwitchCheckbox.setChecked(True)
         self.auto_switch_is_on = True
         self.autoSwitchCheckbox.stateChanged.connect(self.toggle_auto_switch)
+
+        # Add checkbox to run user scripts in sandboxed processes
+        self.sandboxCheckbox = QCheckBox("Sandbox user scripts")
+        self.sandboxCheckbox.setToolTip(
+            "Run figures loaded from a file in separate processes with time and memory limits"
+        )
+        self.sandboxCheckbox.stateChanged.connect(self.toggle_sandbox)
+        self.sandbox_is_on = False
+        self.sandbox = None
+
+        # Add button to show every example figure at once
+        self.galleryButton = QPushButton("Gallery")
+        self.galleryButton.setCheckable(True)
+        self.galleryButton.setToolTip("Preview all the example figures side by side")
+        self.galleryButton.toggled.connect(self.toggle_gallery)
+        self.gallery = None
         self.splitter = QSplitter(Qt.Vertical)
         self.splitter.setSizes(
             [
@@ -83,6 +117,8 @@ class FigureManager(QWidget):
         )
 
         self.upper_layout = QVBoxLayout()
+        self.preview = PreviewWidget()
+        self.upper_layout.addWidget(self.preview)
         self.upper_layout_widget = QWidget()
         self.upper_layout_widget.setLayout(self.upper_layout)
         self.bottom_layout = QHBoxLayout()
@@ -91,6 +127,8 @@ class FigureManager(QWidget):
         self.bottom_right_layout = QVBoxLayout()
         self.bottom_right_layout.setAlignment(Qt.AlignBottom)
         self.bottom_right_layout.addWidget(self.autoSwitchCheckbox)
+        self.bottom_right_layout.addWidget(self.sandboxCheckbox)
+        self.bottom_right_layout.addWidget(self.galleryButton)
         self.bottom_right_layout.addWidget(self.button)
         self.bottom_right_layout.addWidget(self.save_button)
         self.bottom_right_widget = QWidget()
@@ -106,7 +144,82 @@ class FigureManager(QWidget):
         self.which_figure = which_figure
         self.params = params
         self.chosen = None
-        self.canvas = None
+
+        # The disk caches are only an optimization, they are left out when the
+        # cache directory can't be created
+        try:
+            bytecode_dir, renders_dir = cache_dir("bytecode"), cache_dir("renders")
+        except OSError as error:
+            print(f"Running without the disk caches: {error}", file=sys.stderr)
+            bytecode_dir = renders_dir = None
+
+        # Figures are executed and drawn on a background thread
+        self.renderer = FigureRenderer(CodeCache(disk_cache_dir=bytecode_dir))
+        self.render_thread = RenderThread(self.renderer, parent=self)
+        self.render_thread.worker.finished.connect(self.on_render_finished)
+        self.render_thread.start()
+        QApplication.instance().aboutToQuit.connect(self.shutdown)
+        self.generation = 0
+        self.displayed_generation = 0
+        self.requests_sent = 0
+        # Render pipeline statistics, only collected while shown
+        self.metrics = None
+        # Renders caused by each action, printed when requested through the
+        # environment
+        self.render_audit = RenderAudit(
+            print_renders if os.environ.get(RENDER_AUDIT_ENV) else None
+        )
+        self.render_audit.begin("startup")
+        self.preview.swapped.connect(self.on_preview_swapped)
+        self.dependencies = DependencyIndex()
+        # Revisited states are shown without rendering them again, including
+        # the ones rendered in previous sessions
+        self.preview_cache = PreviewCache(
+            preview_cache_size,
+            (
+                DiskRenderCache(renders_dir, disk_cache_size)
+                if renders_dir is not None
+                else None
+            ),
+        )
+        # The previews of the parameter states in the history are linked to
+        # them, revisiting a state finds its preview without hashing it
+        self.history = history
+
+        # Re-render at the new size once the preview stops being resized
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(50)
+        self.resize_timer.timeout.connect(self.request_render)
+        self.preview.resized.connect(self.resize_timer.start)
+
+        # Interactive changes are previewed in draft quality, the full quality
+        # render follows once the input has been idle for refine_delay ms.
+        # Figures whose last full render took longer than frame_budget seconds
+        # are always previewed as drafts first.
+        self.frame_budget = frame_budget
+        self.render_times = {}
+        self.refine_timer = QTimer(self)
+        self.refine_timer.setSingleShot(True)
+        self.refine_timer.setInterval(refine_delay)
+        self.refine_timer.timeout.connect(self.request_render)
+
+        # Thumbnails of the example figures with the current style, rendered
+        # in the background once the style stops changing for thumbnail_delay
+        # ms. They are used as list icons and shown while a figure renders.
+        self.thumbnail_width = thumbnail_width
+        self.thumbnail_results = {}
+        self.thumbnails = ThumbnailRenderer(
+            FigureRenderer(CodeCache()),
+            self.is_rendering,
+            self.preview_cache,
+            parent=self,
+        )
+        self.thumbnails.thumbnailReady.connect(self.on_thumbnail_ready)
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(thumbnail_delay)
+        self.thumbnail_timer.timeout.connect(self.render_thumbnails)
 
         # Check if figure is a path or just name
         if not self.which_figure.endswith(".py"):
@@ -121,12 +234,14 @@ class FigureManager(QWidget):
                 )
         self.execute_python_file(self.which_figure)
         self.tab_changed_to("Figure")
+        self.schedule_thumbnails()
 
     def load_python_file(self):
         filepath, _ = QFileDialog.getOpenFileName(
             self, "Open Python file", "", "Python Files (*.py)"
         )
         if filepath:
+            self.render_audit.begin(f"loading {os.path.basename(filepath)}")
             self.chosen = None
             self.which_figure = filepath
             # turn off auto switch
@@ -135,7 +250,7 @@ class FigureManager(QWidget):
             self.execute_python_file(filepath)
 
     def save_figure(self):
-        if self.canvas and self.canvas.fig:
+        if self.preview.result is not None:
             save_dialog = QDialog(self)
             save_dialog.setWindowTitle("Save Figure Options")
 
@@ -178,7 +293,7 @@ class FigureManager(QWidget):
             save_dialog.exec()
 
     def perform_save(self, format, width, height, dpi, dialog):
-        if self.canvas and self.canvas.fig:
+        if self.preview.result is not None:
             dialog.accept()
             filepath, _ = QFileDialog.getSaveFileName(
                 self,
@@ -187,17 +302,26 @@ class FigureManager(QWidget):
                 f"{format} Files (*.{format.lower()});;All Files (*)",
             )
             if filepath:
-                original_size = self.canvas.fig.get_size_inches()
-                self.canvas.fig.set_size_inches(width, height)
-                self.canvas.fig.savefig(filepath, format=format.lower(), dpi=dpi)
-                self.canvas.fig.set_size_inches(original_size)
+                request = self.preview.result.request
+                saver = self.sandbox if request.sandboxed else self.renderer
+                try:
+                    saver.save(
+                        request, filepath, format.lower(), width, height, dpi
+                    )
+                except RenderError as e:
+                    QMessageBox.warning(self, "Save Figure", str(e))
 
     def choose_builtin_figure(self):
         self.chosen = None
         chosen_fig = self.exampleFigures.currentItem().text()
+        self.render_audit.begin(f"choosing {chosen_fig}")
         self.which_figure = os.path.join(
             os.path.dirname(__file__), "figures", self.example_figs_dict[chosen_fig]
         )
+        thumbnail = self.thumbnail_results.get(os.path.abspath(self.which_figure))
+        if thumbnail is not None and thumbnail.request.params == self.params:
+            # Stretched over the preview until the full render arrives
+            self.preview.set_result(thumbnail)
         self.execute_python_file(
             os.path.join(
                 os.path.dirname(__file__), "figures", self.example_figs_dict[chosen_fig]
@@ -205,61 +329,169 @@ class FigureManager(QWidget):
         )
 
     def execute_python_file(self, filepath):
-        # Clear the canvas widget
-        for i in reversed(range(self.upper_layout.count())):
-            widgetToRemove = self.upper_layout.itemAt(i).widget()
-            if widgetToRemove is self.canvas and self.canvas is not None:
-                self.upper_layout.removeWidget(widgetToRemove)
-                widgetToRemove.setParent(None)
-        close("all")
-
-        original_show = gl.Figure.show
-        original_save = gl.Figure.save
-        original_multi_show = gl.MultiFigure.show
-        original_multi_save = gl.MultiFigure.save
-        gl.Figure.show = self.dummy_show
-        gl.Figure.save = self.dummy_save
-        gl.MultiFigure.show = self.dummy_show
-        gl.MultiFigure.save = self.dummy_save
-
-        # Execute the script
-        namespace = {"gl": gl, "__builtins__": __builtins__}
-        with open(filepath) as file:
-            code = compile(file.read(), filepath, "exec")
-            exec(code, namespace, namespace)
-
-        gl.Figure.show = original_show
-        gl.Figure.save = original_save
-        gl.MultiFigure.show = original_multi_show
-        gl.MultiFigure.save = original_multi_save
-        # Check for figures in the namespace and display them
-        figures = {}
-        for name, var in namespace.items():
-            if isinstance(var, gl.Figure) or isinstance(var, gl.MultiFigure):
-                figures[name] = var
+        self.which_figure = filepath
+        self.request_render()
+
+    @profiling.profiled
+    def request_render(self, draft=False):
+        if not draft:
+            self.refine_timer.stop()
+        if self.is_gallery_shown():
+            # The preview is hidden, the gallery shows the figure instead
+            self.gallery.set_focus(self.which_figure)
+            return
+        self.generation += 1
+        self.render_thread.worker.latest_generation = self.generation
+        width, height = self.preview.pixel_size()
+        request = RenderRequest(
+            self.generation,
+            self.which_figure,
+            self.chosen,
+            self.params,
+            width,
+            height,
+            self.preview.devicePixelRatioF(),
+            sandboxed=self.sandbox_is_on and not self.is_builtin_figure(),
+            draft=draft,
+        )
+        key = self.history.preview_key(request) if self.history is not None else None
+        cached = self.preview_cache.get(request, key)
+        if cached is not None:
+            self.refine_timer.stop()
+            self.on_render_finished(cached)
+            return
+        self.render_audit.count_render()
+        if profiling.active_profiler is not None:
+            # Render on this thread so that it is part of the profile
+            renderer = self.sandbox if request.sandboxed else self.renderer
+            self.on_render_finished(renderer.render(request))
+            return
+        self.thumbnails.preempt()
+        self.requests_sent += 1
+        self.render_thread.requested.emit(request)
+
+    def set_refine_delay(self, delay: int):
+        self.refine_timer.setInterval(delay)
+
+    def is_interacting(self):
+        # A slider or spin box is being dragged
+        return QApplication.mouseButtons() != Qt.NoButton
+
+    def is_slow_figure(self):
+        render_time = self.render_times.get(self.displayed_figure(), 0)
+        return render_time > self.frame_budget
+
+    def is_rendering(self):
+        # A preview is being rendered or is about to be requested
+        return (
+            self.generation != self.displayed_generation
+            or self.resize_timer.isActive()
+            or self.refine_timer.isActive()
+            or self.is_interacting()
+            or self.is_gallery_shown()
+        )
+
+    def is_builtin_figure(self):
+        figures_dir = os.path.join(os.path.dirname(__file__), "figures")
+        return os.path.dirname(os.path.abspath(self.which_figure)) == figures_dir
+
+    def toggle_sandbox(self):
+        self.sandbox_is_on = self.sandboxCheckbox.isChecked()
+        if self.sandbox_is_on and self.sandbox is None:
+            from .sandbox import SandboxPool
+
+            # Start the worker processes now so they are warm for the next render
+            self.sandbox = SandboxPool()
+            self.render_thread.worker.sandbox = self.sandbox
+        self.request_render()
+
+    def toggle_gallery(self, checked):
+        if checked and self.gallery is None:
+            from .gallery import GalleryWidget
+
+            # Started on first use, the pool has one process per core
+            self.gallery = GalleryWidget(
+                self.builtin_figure_paths(), self.dependencies, self.preview_cache
+            )
+            self.gallery.tileClicked.connect(self.choose_gallery_tile)
+            self.upper_layout.addWidget(self.gallery)
+        self.preview.setVisible(not checked)
+        if self.gallery is not None:
+            self.gallery.setVisible(checked)
+        if checked:
+            self.gallery.set_focus(self.which_figure)
+            self.gallery.set_params(self.params)
+        else:
+            self.request_render()
+
+    def is_gallery_shown(self):
+        return self.gallery is not None and self.galleryButton.isChecked()
+
+    def choose_gallery_tile(self, filepath):
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        items = self.exampleFigures.findItems(name, Qt.MatchExactly)
+        if items:
+            self.exampleFigures.setCurrentItem(items[0])
+
+    def shutdown(self):
+        self.render_audit.finish()
+        if self.gallery is not None:
+            self.gallery.shutdown()
+        self.thumbnails.stop()
+        self.render_thread.stop()
+        if self.preview_cache.disk is not None:
+            self.preview_cache.disk.close()
+        if self.sandbox is not None:
+            self.sandbox.shutdown()
+
+    def on_render_finished(self, result):
+        if result.generation < self.displayed_generation:
+            return
+        if result.request.filepath != self.which_figure:
+            # A different figure was chosen since this render was requested
+            return
+        self.displayed_generation = result.generation
+        self.dependencies.update(
+            os.path.abspath(result.request.filepath), result.dependencies
+        )
+        if result.error:
+            self.preview.set_error(result.error)
+            self.renderFinished.emit(result)
+            return
 
         # Popup to ask user which figure to display
         if self.chosen is None:
-            if len(figures) > 1:
-                self.chosen = self.choose_figure_from_file(figures.keys())
-            else:
-                self.chosen = list(figures.keys())[0]
-
-        if self.chosen is not None:
-            fig = figures[self.chosen]
-            if isinstance(fig, gl.MultiFigure):
-                fig._prepare_multi_figure()
-            elif isinstance(fig, gl.Figure):
-                fig.figure_style = "plain"
-                fig._prepare_figure(default_params=self.params)
-            self.display_figure(fig._figure)
-
-    def display_figure(self, fig):
-        self.canvas = GLCanvas(fig)
-        # add widget to layout in position 1 (after the button)
-        self.upper_layout.insertWidget(0, self.canvas)
-        # self.layout.addWidget(self.canvas)
-        # canvas.draw()
+            if result.chosen is None:
+                if not result.figure_names:
+                    self.preview.set_error("No figure found in this file")
+                    self.renderFinished.emit(result)
+                    return
+                self.chosen = self.choose_figure_from_file(result.figure_names)
+                if self.chosen is not None:
+                    self.request_render()
+                return
+            self.chosen = result.chosen
+
+        if result.ok:
+            if self.metrics is not None and result.timings:
+                self.metrics.record(result.timings)
+            self.preview.set_result(result)
+            key = self.preview_cache.put(result)
+            if key is not None and self.history is not None:
+                self.history.link(result.request, key)
+            if not result.request.draft and not result.from_cache:
+                self.render_times[self.displayed_figure()] = result.render_time
+        self.renderFinished.emit(result)
+
+    def set_metrics_enabled(self, enabled: bool):
+        self.metrics = RenderMetrics() if enabled else None
+
+    def queue_depth(self) -> int:
+        return self.requests_sent - self.render_thread.worker.handled_count
+
+    def on_preview_swapped(self, duration):
+        if self.metrics is not None:
+            self.metrics.record_stage("swap", duration)
 
     def choose_figure_from_file(self, figures):
         chosen, ok = QInputDialog.getItem(
@@ -269,11 +501,80 @@ class FigureManager(QWidget):
             return chosen
         return None
 
+    def displayed_figure(self):
+        return os.path.abspath(self.which_figure), self.chosen
+
+    def params_changed(self, changes) -> bool:
+        """
+        Returns whether the figure on display depends on any of the changed
+        ``(section, key)`` parameters.
+        """
+        if changes:
+            self.schedule_thumbnails()
+        affects_preview = self.dependencies.affects(self.displayed_figure(), changes)
+        # The gallery shows every figure, it decides which ones to update
+        return affects_preview or (bool(changes) and self.is_gallery_shown())
+
+    @profiling.profiled(counts_update=True)
     def update(self, params):
         self.params = params
-        # Reset plt.rcParams to mpl default
-        plt.rcParams.update(plt.rcParamsDefault)
-        self.execute_python_file(self.which_figure)
+        self.schedule_thumbnails()
+        if self.is_gallery_shown():
+            self.gallery.set_params(params)
+            return
+        if self.is_interacting() or self.is_slow_figure():
+            self.request_render(draft=True)
+            self.refine_timer.start()
+        else:
+            self.request_render()
+
+    def builtin_figure_paths(self) -> list[str]:
+        figures_dir = os.path.join(os.path.dirname(__file__), "figures")
+        return [
+            os.path.join(figures_dir, filename)
+            for filename in self.example_figs_dict.values()
+            if filename.endswith(".py")
+        ]
+
+    def schedule_thumbnails(self):
+        # Thumbnails of the previous style are not worth finishing
+        self.thumbnails.cancel()
+        self.thumbnail_timer.start()
+
+    def render_thumbnails(self):
+        # Same layout as the preview, at a fraction of its resolution
+        width, height = self.preview.pixel_size()
+        scale = self.thumbnail_width / max(1, width)
+        params = self.params
+        self.thumbnails.start(
+            [
+                RenderRequest(
+                    0,
+                    filepath,
+                    None,
+                    params,
+                    max(1, round(width * scale)),
+                    max(1, round(height * scale)),
+                    self.preview.devicePixelRatioF() * scale,
+                )
+                for filepath in self.builtin_figure_paths()
+            ]
+        )
+
+    def on_thumbnail_ready(self, result):
+        filepath = os.path.abspath(result.request.filepath)
+        self.thumbnail_results[filepath] = result
+        image = QImage(
+            result.buffer,
+            result.width,
+            result.height,
+            result.width * 4,
+            QImage.Format_RGBA8888,
+        )
+        icon = QIcon(QPixmap.fromImage(image))
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        for item in self.exampleFigures.findItems(name, Qt.MatchExactly):
+            item.setIcon(icon)
 
     def toggle_auto_switch(self):
         self.auto_switch_is_on = self.autoSwitchCheckbox.isChecked()
@@ -285,12 +586,6 @@ class FigureManager(QWidget):
                 list(self.example_figs_dict.keys()).index(tab_name)
             )
 
-    def dummy_show(*args, **kwargs):
-        pass
-
-    def dummy_save(*args, **kwargs):
-        pass
-
 
 class StyleManager(QDialog):
     def __init__(self, parent=None):
@@ -505,13 +800,16 @@ class MainWindow(QMainWindow):
 
         # Updatable parameters
         self.current_style = gl.get_default_style()
-        self.unsaved_changes = {}
-        self.params = gl.file_manager.FileLoader(self.current_style).load()
-        self.original_params = {}
-        for section in self.params:
-            self.original_params[section] = {}
-            for param in self.params[section]:
-                self.original_params[section][param] = self.params[section][param]
+        self.param_store = ParamStore(
+            gl.file_manager.FileLoader(self.current_style).load()
+        )
+        # Undo and redo steps, one per batch of changes
+        self.history = ParamHistory(self.params)
+        # (section, key) parameters changed in the current batch
+        self.pending_changes = []
+        self.param_store.subscribe(self.param_changed)
+        self.batch_depth = 0
+        self.batch_start = None
 
         # Main widget and layout
         self.mainWidget = QWidget(self)
@@ -568,6 +866,34 @@ class MainWindow(QMainWindow):
         self.saveAction.setShortcut("Ctrl+S")
         self.managerAction.setShortcut("Ctrl+M")
 
+        # Add an edit menu to undo and redo parameter changes
+        self.editMenu = self.menuBar.addMenu("Edit")
+        self.undoAction = self.editMenu.addAction("Undo")
+        self.redoAction = self.editMenu.addAction("Redo")
+        self.undoAction.setShortcut(QKeySequence.Undo)
+        self.redoAction.setShortcut(QKeySequence.Redo)
+        self.undoAction.triggered.connect(self.undo)
+        self.redoAction.triggered.connect(self.redo)
+        self.update_history_actions()
+
+        # Add a view menu
+        self.viewMenu = self.menuBar.addMenu("View")
+        self.metricsAction = self.viewMenu.addAction("Render Metrics")
+        self.metricsAction.setCheckable(True)
+        self.metricsAction.setShortcut("Ctrl+Shift+M")
+        self.metricsAction.toggled.connect(self.toggle_render_metrics)
+        self.metricsLabel = QLabel(self)
+        # Clip the text rather than widening the window
+        self.metricsLabel.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
+        self.metricsTimer = QTimer(self)
+        self.metricsTimer.setInterval(250)
+        self.metricsTimer.timeout.connect(self.update_render_metrics)
+
+        # Add a help menu
+        self.helpMenu = self.menuBar.addMenu("Help")
+        self.profileAction = self.helpMenu.addAction("Profile Next N Updates...")
+        self.profileAction.triggered.connect(self.profile_updates)
+
         # Add a field for the figure style name
         self.upperLayout = QHBoxLayout()
         self.mainLayout.addLayout(self.upperLayout)
@@ -590,33 +916,49 @@ class MainWindow(QMainWindow):
 
         # Create and add the tab widget and canvas
         self.tabWidget = QTabWidget()
-        self.canvas = FigureManager(self.params, which_figure="curve")
+        self.canvas = FigureManager(
+            self.params, which_figure="curve", history=self.history
+        )
         self.splitter.addWidget(self.tabWidget)
         self.splitter.addWidget(self.canvas)
         self.splitter.setSizes([int(width * 0.3), int(width * 0.3)])
 
+        # Coalesce parameter changes into at most one render per frame
+        self.render_scheduler = RenderScheduler(self.canvas.update, parent=self)
+
         # Set the splitter as the main layout widget
         self.mainLayout.addWidget(self.splitter)
 
-        # Create all the tabs
+        # Create all the tabs, their widgets are rebound to new params
+        self.widget_registry = WidgetRegistry()
         self.create_tabs()
 
+        # Add tab changed event to update the canvas
+        self.tabWidget.currentChanged.connect(self.tab_changed)
+
         # Set the main widget
         self.setCentralWidget(self.mainWidget)
 
+        # Profile the first updates when requested through the environment
+        count = os.environ.get(profiling.PROFILE_ENV)
+        if count:
+            try:
+                count = int(count)
+            except ValueError:
+                print(
+                    f"Ignoring {profiling.PROFILE_ENV}={count!r}, "
+                    "expected a number of updates",
+                    file=sys.stderr,
+                )
+            else:
+                profiling.start_profiling(count, self.profiling_finished)
+
     def create_tabs(self):
-        # Combined Figure and Axes tab
-        self.figureTab = QWidget()
-        figureTabLayout = create_figure_tab(self)
-        self.figureTab.setLayout(figureTabLayout)
-        self.figureTabScrollArea = QScrollArea()
-        self.figureTabScrollArea.setWidgetResizable(True)
-        self.figureTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.figureTabScrollArea.setWidget(self.figureTab)
-        self.tabWidget.addTab(self.figureTabScrollArea, "Figure")
+        # The content of each tab is only created once it is first shown
 
-        # Add tab changed event to update the canvas
-        self.tabWidget.currentChanged.connect(self.tab_changed)
+        # Combined Figure and Axes tab
+        self.figureTab = LazyTab(self, create_figure_tab)
+        self.tabWidget.addTab(self.figureTab, "Figure")
 
         # 1D Plotting tab with nested tabs
         self.plotting1DTab = QWidget()
@@ -631,14 +973,8 @@ class MainWindow(QMainWindow):
         self.tab_widget_2d.currentChanged.connect(self.sub_tab_changed)
 
         # Fits tab
-        self.fitsTab = QWidget()
-        fitsTabLayout = create_fits_tab(self)
-        self.fitsTab.setLayout(fitsTabLayout)
-        self.fitsTabScrollArea = QScrollArea()
-        self.fitsTabScrollArea.setWidgetResizable(True)
-        self.fitsTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.fitsTabScrollArea.setWidget(self.fitsTab)
-        self.tabWidget.addTab(self.fitsTabScrollArea, "Fits")
+        self.fitsTab = LazyTab(self, create_fits_tab)
+        self.tabWidget.addTab(self.fitsTab, "Fits")
 
         # Shapes tab with nested tabs
         self.shapesTab = QWidget()
@@ -652,12 +988,62 @@ class MainWindow(QMainWindow):
         self.tab_widget_other_gl = create_other_gl_tab(self)
         self.tab_widget_other_gl.currentChanged.connect(self.sub_tab_changed)
 
+    @property
+    def params(self) -> dict:
+        # Snapshot of the parameters, they are changed within a batch
+        return self.param_store.snapshot()
+
+    @property
+    def unsaved_changes(self) -> dict:
+        return self.param_store.unsaved_changes()
+
+    def reset_params(self, params: dict, saved: bool = True):
+        # Steps made on other params can't be undone
+        self.param_store.reset(params, saved)
+        self.history.reset(self.params)
+        self.update_history_actions()
+
+    def undo(self):
+        entry = self.history.undo()
+        if entry is not None:
+            self.restore_params(entry.params)
+
+    def redo(self):
+        entry = self.history.redo()
+        if entry is not None:
+            self.restore_params(entry.params)
+
+    def restore_params(self, params: dict):
+        """
+        Go back to params of the history, showing them in the widgets.
+        """
+        with self.batch():
+            self.param_store.restore(params)
+            self.widget_registry.rebind(self.params)
+        # Render now rather than on the next frame, the preview is usually
+        # still cached and linked to the history
+        self.render_scheduler.flush()
+        self.update_history_actions()
+
+    def update_history_actions(self):
+        self.undoAction.setEnabled(self.history.can_undo())
+        self.redoAction.setEnabled(self.history.can_redo())
+
+    def rebind_widgets(self):
+        """
+        Show the current params in the widgets of the tabs, then render them.
+        """
+        self.canvas.render_audit.begin(f"showing {self.current_style}")
+        with self.batch():
+            self.widget_registry.rebind(self.params)
+        self.updateFigure()
+
     def updateFigure(self):
-        # Update the figure after changing parameters
-        self.canvas.update(self.params)
+        # Schedule a figure update after changing parameters
+        self.render_scheduler.request(self.params)
 
     def load(self):
-        if self.unsaved_changes:
+        if self.param_store.is_dirty:
             msg = "You have unsaved changes that will be lost. Are you sure you want to load a new style?"
             reply = QMessageBox.question(
                 self, "Unsaved Changes", msg, QMessageBox.Yes, QMessageBox.No
@@ -673,46 +1059,13 @@ class MainWindow(QMainWindow):
         )
         if ok:
             # Load the style
-            self.params = gl.file_manager.FileLoader(style).load()
+            self.reset_params(gl.file_manager.FileLoader(style).load())
             # update the current style
             self.current_style = style
 
-            self.updateFigure()
-            # Identify the current tab
-            current_tab = self.tabWidget.currentIndex()
-            try:
-                current_sub_tab = (
-                    self.tabWidget.currentWidget()
-                    .layout()
-                    .itemAt(0)
-                    .widget()
-                    .currentIndex()
-                )
-            except:
-                current_sub_tab = None
-            # remove all tabs and recreate them to update the params
-            auto_switch_original = self.canvas.auto_switch_is_on
-            self.canvas.auto_switch_is_on = False
-            for i in range(self.tabWidget.count()):
-                self.tabWidget.removeTab(0)
-            self.create_tabs()
-            # set the current tab
-            self.tabWidget.setCurrentIndex(current_tab)
-            if current_sub_tab is not None:
-                self.tabWidget.currentWidget().layout().itemAt(
-                    0
-                ).widget().setCurrentIndex(current_sub_tab)
-            self.canvas.auto_switch_is_on = auto_switch_original
-
-            # update the original params
-            self.original_params = {}
-            for section in self.params:
-                self.original_params[section] = {}
-                for param in self.params[section]:
-                    self.original_params[section][param] = self.params[section][param]
-            # clear unsaved changes
-            self.unsaved_changes = {}
-            self.styleNameLabel.setText("Current Style: " + self.current_style)
+            # show the params in the tabs and update the figure
+            self.rebind_widgets()
+            self.update_style_label()
 
     def save(self):
         if self.current_style == "no name":
@@ -723,17 +1076,9 @@ class MainWindow(QMainWindow):
 
         # update the current style
         self.current_style = name
-        self.styleNameLabel.setText("Current Style: " + self.current_style)
-
         # clear unsaved changes
-        self.unsaved_changes = {}
-
-        # update the original params
-        self.original_params = {}
-        for section in self.params:
-            self.original_params[section] = {}
-            for param in self.params[section]:
-                self.original_params[section][param] = self.params[section][param]
+        self.param_store.mark_saved()
+        self.update_style_label()
 
     def save_as(self):
         # ask for a new style name
@@ -764,21 +1109,15 @@ class MainWindow(QMainWindow):
             gl.file_manager.FileSaver(name, self.params).save()
             # update the current style
             self.current_style = name
-            self.styleNameLabel.setText("Current Style: " + self.current_style)
             # clear unsaved changes
-            self.unsaved_changes = {}
-            # update the original params
-            self.original_params = {}
-            for section in self.params:
-                self.original_params[section] = {}
-                for param in self.params[section]:
-                    self.original_params[section][param] = self.params[section][param]
+            self.param_store.mark_saved()
+            self.update_style_label()
         else:
             return
 
     def new(self):
         # check if there are unsaved changes
-        if self.unsaved_changes:
+        if self.param_store.is_dirty:
             msg = "You have unsaved changes that will be lost. Are you sure you want to create a new style?"
             reply = QMessageBox.question(
                 self, "Unsaved Changes", msg, QMessageBox.Yes, QMessageBox.No
@@ -799,37 +1138,17 @@ class MainWindow(QMainWindow):
             False,
         )
         if ok:
-            # load the style
-            self.params = gl.file_manager.FileLoader(style).load()
+            # load the style, none of its params are saved under the new name
+            self.reset_params(gl.file_manager.FileLoader(style).load(), saved=False)
             # update the current style
             self.current_style = "no name"
-            self.styleNameLabel.setText("Current Style: " + self.current_style)
-            # update the figure
-            self.updateFigure()
-            # remove all tabs and recreate them to update the params
-            auto_switch_original = self.canvas.auto_switch_is_on
-            self.canvas.auto_switch_is_on = False
-            for i in range(self.tabWidget.count()):
-                self.tabWidget.removeTab(0)
-            self.create_tabs()
-            self.canvas.auto_switch_is_on = auto_switch_original
-            # update the original params
-            self.original_params = {}
-            for section in self.params:
-                self.original_params[section] = {}
-                for param in self.params[section]:
-                    self.original_params[section][param] = self.params[section][param]
-            # set unsaved changes to be the same as the original params
-            for section in self.original_params:
-                self.unsaved_changes[section] = {}
-                for param in self.original_params[section]:
-                    self.unsaved_changes[section][param] = self.original_params[
-                        section
-                    ][param]
+            # show the params in the tabs and update the figure
+            self.rebind_widgets()
+            self.update_style_label()
 
     def manage_styles(self):
         # check if there are unsaved changes
-        if self.unsaved_changes:
+        if self.param_store.is_dirty:
             msg = "You have unsaved changes which will be lost. Are you sure you want to manage styles?"
             reply = QMessageBox.question(
                 self, "Unsaved Changes", msg, QMessageBox.Yes, QMessageBox.No
@@ -841,129 +1160,96 @@ class MainWindow(QMainWindow):
         # reload the current style
         if self.current_style not in gl.get_styles(gl=True, customs=True):
             self.current_style = gl.get_default_style()
-        self.params = gl.file_manager.FileLoader(self.current_style).load()
-        self.updateFigure()
-
-        # remove all tabs and recreate them to update the params
-        auto_switch_original = self.canvas.auto_switch_is_on
-        self.canvas.auto_switch_is_on = False
-        for i in range(self.tabWidget.count()):
-            self.tabWidget.removeTab(0)
-        self.create_tabs()
-        # update the original params
-        self.original_params = {}
-        for section in self.params:
-            self.original_params[section] = {}
-            for param in self.params[section]:
-                self.original_params[section][param] = self.params[section][param]
-        # set unsaved changes to be nothing
-        self.unsaved_changes = {}
-
+        self.reset_params(gl.file_manager.FileLoader(self.current_style).load())
+        # show the params in the tabs and update the figure
+        self.rebind_widgets()
         # update the style name label
-        self.styleNameLabel.setText("Current Style: " + self.current_style)
-
-        self.canvas.auto_switch_is_on = auto_switch_original
+        self.update_style_label()
 
+    @profiling.profiled
     def update_params(self, sections: str | list, params_name: str | list, value):
         if not isinstance(params_name, list):
             params_name = [params_name]
         if not isinstance(sections, list):
             sections = [sections]
-        for section in sections:
-            for p in params_name:
-                # Update the parameters
-                self.params[section][p] = value
-
-                # Check if the new value is different from the original
-                orig = self.original_params[section][p]
-                if orig != value:
-                    # set value in unsaved changes dict (may have to create section/params_name key)
-                    if section not in self.unsaved_changes:
-                        self.unsaved_changes[section] = {}
-                    self.unsaved_changes[section][p] = value
-                else:
-                    # remove value from unsaved changes dict
-                    if section in self.unsaved_changes:
-                        if p in self.unsaved_changes[section]:
-                            del self.unsaved_changes[section][p]
-                        if not self.unsaved_changes[section]:
-                            del self.unsaved_changes[section]
-
-        # Update the figure
-        self.updateFigure()
+        with self.batch():
+            for section in sections:
+                for p in params_name:
+                    self.param_store.set(section, p, value)
 
-        # Update the style name label to indicate unsaved changes
-        if self.unsaved_changes:
+    @contextmanager
+    def batch(self):
+        """
+        Group the parameter changes made in the block. The figure and the
+        style name label are updated once, when the outermost batch ends.
+        """
+        if self.batch_depth == 0:
+            self.batch_start = self.params
+        self.batch_depth += 1
+        try:
+            yield
+        finally:
+            self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.apply_param_changes()
+
+    def param_changed(self, section: str, key: str, value):
+        self.pending_changes.append((section, key))
+
+    def apply_param_changes(self):
+        # Parameters set back to their value from before the batch are left out
+        changes = self.param_store.changed_since(
+            self.batch_start, self.pending_changes
+        )
+        self.pending_changes = []
+        self.batch_start = None
+        if changes:
+            self.canvas.render_audit.begin(
+                "changing " + ", ".join(f"{section}.{key}" for section, key in changes)
+            )
+            # A dragged slider makes a single step
+            self.history.record(
+                self.params, changes, merge=self.canvas.is_interacting()
+            )
+            self.update_history_actions()
+        # The canvas renders the current parameters whenever it renders, e.g.
+        # after choosing another figure
+        self.canvas.params = self.params
+        # Update the figure, unless it doesn't use the changed parameters
+        if self.canvas.params_changed(changes):
+            self.updateFigure()
+        self.update_style_label()
+
+    def update_style_label(self):
+        # Indicate unsaved changes
+        if self.param_store.is_dirty:
             self.styleNameLabel.setText(
                 "Current Style: " + self.current_style + " (unsaved changes)"
             )
         else:
             self.styleNameLabel.setText("Current Style: " + self.current_style)
 
-    def update_rc_params_from_table(self, table: dict, init=False):
+    def update_rc_params_from_table(self, table: dict):
         """
         Update the rc_params with the values in the table
         """
         if not self.updating_from_table:
             self.updating_from_table = True
-            # Get the parameters to remove from the rc_params
-            table_remove = {}
-            # make list of keys that are in self.params["rc_params"] but not in self.handled_by_gui
-            possible_keys = [
-                key
-                for key in list(self.params["rc_params"].keys())
-                if key not in table and key not in self.handled_by_gui
-            ]
-            for key in possible_keys:
-                table_remove[key] = self.params["rc_params"][key]
-
-            # Remove parameters from self.params["rc_params"]
-            for key in table_remove:
-                del self.params["rc_params"][key]
-                # Check if the new value is different from the original (if it even existed in the original)
-                orig = self.original_params["rc_params"].get(key, None)
-                if orig is not None:
-                    # set value in unsaved changes dict (may have to create section/params_name key)
-                    if "rc_params" not in self.unsaved_changes:
-                        self.unsaved_changes["rc_params"] = {}
-                    self.unsaved_changes["rc_params"][key] = None
-                else:
-                    # remove value from unsaved changes dict
-                    if "rc_params" in self.unsaved_changes:
-                        if key in self.unsaved_changes["rc_params"]:
-                            del self.unsaved_changes["rc_params"][key]
-                        if not self.unsaved_changes["rc_params"]:
-                            del self.unsaved_changes["rc_params"]
-
-            for key in table:
-                self.params["rc_params"][key] = table[key]
-                # Check if the new value is different from the original (if it even existed in the original)
-                orig = self.original_params["rc_params"].get(key, None)
-                if str(orig) != table[key]:
-                    # set value in unsaved changes dict (may have to create section/params_name key)
-                    if "rc_params" not in self.unsaved_changes:
-                        self.unsaved_changes["rc_params"] = {}
-                    self.unsaved_changes["rc_params"][key] = table[key]
-                else:
-                    # remove value from unsaved changes dict
-                    if "rc_params" in self.unsaved_changes:
-                        if key in self.unsaved_changes["rc_params"]:
-                            del self.unsaved_changes["rc_params"][key]
-                        if not self.unsaved_changes["rc_params"]:
-                            del self.unsaved_changes["rc_params"]
-
-            # Update the figure
-            if not init:
-                self.updateFigure()
-
-            # Update the style name label to indicate unsaved changes
-            if self.unsaved_changes:
-                self.styleNameLabel.setText(
-                    "Current Style: " + self.current_style + " (unsaved changes)"
-                )
-            else:
-                self.styleNameLabel.setText("Current Style: " + self.current_style)
-
+            with self.batch():
+                # Remove the parameters that are neither in the table nor in the GUI
+                for key in list(self.params["rc_params"]):
+                    if key not in table and key not in self.handled_by_gui:
+                        self.param_store.remove("rc_params", key)
+
+                rc_params = self.params["rc_params"]
+                for key, value in table.items():
+                    # The table holds text, values that weren't edited keep their type
+                    if key in rc_params and str(rc_params[key]) == value:
+                        continue
+                    saved = self.param_store.baseline_value("rc_params", key)
+                    if saved is not None and str(saved) == value:
+                        value = saved
+                    self.param_store.set("rc_params", key, value)
             self.updating_from_table = False
 
     def view_unsaved_changes(self):
@@ -1052,6 +1338,49 @@ class MainWindow(QMainWindow):
                 current_sub_tab = None
             self.canvas.tab_changed_to(current_sub_tab)
 
+    def profile_updates(self):
+        count, ok = QInputDialog.getInt(
+            self,
+            "Profile Updates",
+            "Number of figure updates to profile:",
+            20,
+            1,
+            10000,
+        )
+        if ok:
+            profiling.start_profiling(
+                count, lambda paths: self.profiling_finished(paths, interactive=True)
+            )
+
+    def profiling_finished(self, paths, interactive=False):
+        pstats_path, folded_path = paths
+        print(f"Profile written to {pstats_path} and {folded_path}", file=sys.stderr)
+        if interactive:
+            QMessageBox.information(
+                self,
+                "Profile Updates",
+                "The profile was written to:\n\n"
+                f"{pstats_path}\n(for pstats, snakeviz...)\n\n"
+                f"{folded_path}\n(collapsed stacks, for flamegraph.pl, speedscope...)",
+            )
+
+    def toggle_render_metrics(self, checked):
+        self.canvas.set_metrics_enabled(checked)
+        if checked:
+            self.statusBar().addPermanentWidget(self.metricsLabel, 1)
+            self.metricsLabel.show()
+            self.metricsTimer.start()
+            self.update_render_metrics()
+        else:
+            self.metricsTimer.stop()
+            self.statusBar().removeWidget(self.metricsLabel)
+        self.statusBar().setVisible(checked)
+
+    def update_render_metrics(self):
+        metrics = self.canvas.metrics
+        if metrics is not None:
+            self.metricsLabel.setText(metrics.format(self.canvas.queue_depth()))
+
     def closeEvent(self, a0: QCloseEvent | None) -> None:
         # Check if there are unsaved changes
         if self.unsaved_changes:
@@ -1064,8 +1393,9 @@ class MainWindow(QMainWindow):
                 return
 
 
-def run():
-    app = QApplication(sys.argv)
+def create_window(app: QApplication) -> MainWindow:
+    from qt_material import apply_stylesheet
+
     mainWin = MainWindow()
     apply_stylesheet(
         app,
@@ -1073,5 +1403,11 @@ def run():
         css_file=f"{os.path.dirname(__file__)}/custom.css",
         extra={"density_scale": -2, "font_size": 15},
     )
+    return mainWin
+
+
+def run():
+    app = QApplication(sys.argv)
+    mainWin = create_window(app)
     mainWin.show()
     sys.exit(app.exec_())
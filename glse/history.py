@@ -0,0 +1,109 @@
+import os
+
+from .rendering import RenderRequest
+
+
+def preview_view(request: RenderRequest) -> tuple:
+    # What a preview shows, apart from the parameters
+    return (
+        os.path.abspath(request.filepath),
+        request.chosen,
+        request.width,
+        request.height,
+        request.pixel_ratio,
+    )
+
+
+class HistoryEntry:
+    def __init__(self, params: dict, changes: list[tuple[str, str]]):
+        # ParamStore snapshot after the step, sharing the sections it didn't
+        # change with the other entries
+        self.params = params
+        self.changes = changes
+        # Preview view -> key of its render in the preview cache
+        self.preview_keys = {}
+
+
+class ParamHistory:
+    """
+    Unbounded undo and redo history of the parameters, one entry per
+    committed batch of changes. Entries are snapshots of the ParamStore, so
+    each one only holds copies of the sections its step changed. The
+    previews rendered for an entry are linked to it by their preview cache
+    key, stepping back to it shows them without hashing the parameters.
+    """
+
+    def __init__(self, params: dict):
+        self.reset(params)
+
+    def reset(self, params: dict):
+        self.entries = []
+        # id of the params of each entry -> entry, the entries keep them alive
+        self.by_params = {}
+        self.index = -1
+        self.append(HistoryEntry(params, []))
+
+    def append(self, entry: HistoryEntry):
+        self.entries.append(entry)
+        self.by_params[id(entry.params)] = entry
+        self.index += 1
+
+    def truncate(self, length: int):
+        for entry in self.entries[length:]:
+            del self.by_params[id(entry.params)]
+        del self.entries[length:]
+        self.index = min(self.index, length - 1)
+
+    @property
+    def current(self) -> HistoryEntry:
+        return self.entries[self.index]
+
+    def record(self, params: dict, changes: list[tuple[str, str]], merge=False):
+        """
+        Add the parameters after a step, dropping the steps that were undone.
+        With ``merge``, a step changing the same parameters as the last one
+        replaces it, e.g. while a slider is dragged.
+        """
+        if params is self.current.params:
+            # Undoing or redoing restores the snapshot of an entry
+            return
+        if merge and self.index > 0 and not self.can_redo() and (
+            self.current.changes == changes
+        ):
+            self.truncate(self.index)
+        else:
+            self.truncate(self.index + 1)
+        self.append(HistoryEntry(params, changes))
+
+    def can_undo(self) -> bool:
+        return self.index > 0
+
+    def can_redo(self) -> bool:
+        return self.index < len(self.entries) - 1
+
+    def undo(self) -> HistoryEntry | None:
+        if not self.can_undo():
+            return None
+        self.index -= 1
+        return self.current
+
+    def redo(self) -> HistoryEntry | None:
+        if not self.can_redo():
+            return None
+        self.index += 1
+        return self.current
+
+    def entry_for(self, params: dict) -> HistoryEntry | None:
+        # Renders are requested with the snapshot of an entry itself
+        return self.by_params.get(id(params))
+
+    def preview_key(self, request: RenderRequest):
+        entry = self.entry_for(request.params)
+        if entry is None:
+            return None
+        return entry.preview_keys.get(preview_view(request))
+
+    def link(self, request: RenderRequest, key):
+        entry = self.entry_for(request.params)
+        if entry is not None:
+            entry.preview_keys[preview_view(request)] = key
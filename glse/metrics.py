@@ -0,0 +1,101 @@
+import sys
+import time
+from collections import deque
+
+STAGES = ("compile", "exec", "prepare", "draw", "swap")
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class RenderMetrics:
+    """
+    Rolling statistics of the duration of each stage of the preview
+    pipeline, over the last ``window`` renders.
+    """
+
+    def __init__(self, window: int = 100, rate_window: float = 5.0):
+        self.samples = {stage: deque(maxlen=window) for stage in STAGES}
+        self.latest = {}
+        self.rate_window = rate_window
+        self.completed = deque()
+
+    def record(self, timings: dict):
+        for stage, duration in timings.items():
+            if stage in self.samples:
+                self.samples[stage].append(duration)
+                self.latest[stage] = duration
+        now = time.monotonic()
+        self.completed.append(now)
+        while self.completed and now - self.completed[0] > self.rate_window:
+            self.completed.popleft()
+
+    def record_stage(self, stage: str, duration: float):
+        self.samples[stage].append(duration)
+        self.latest[stage] = duration
+
+    def renders_per_second(self) -> float:
+        now = time.monotonic()
+        recent = [t for t in self.completed if now - t <= self.rate_window]
+        return len(recent) / self.rate_window
+
+    def summary(self) -> dict:
+        return {
+            stage: {
+                "latest": self.latest.get(stage, 0.0),
+                "p50": percentile(samples, 0.5),
+                "p95": percentile(samples, 0.95),
+            }
+            for stage, samples in self.samples.items()
+        }
+
+    def format(self, queue_depth: int = 0) -> str:
+        parts = [
+            f"{stage} {values['latest'] * 1000:.1f} ms "
+            f"(p50 {values['p50'] * 1000:.1f} / p95 {values['p95'] * 1000:.1f})"
+            for stage, values in self.summary().items()
+        ]
+        parts.append(f"{self.renders_per_second():.1f} renders/s")
+        parts.append(f"queue {queue_depth}")
+        return "  |  ".join(parts)
+
+
+# Report the renders caused by each action on stderr, e.g. GLSE_DEBUG_RENDERS=1
+RENDER_AUDIT_ENV = "GLSE_DEBUG_RENDERS"
+
+
+class RenderAudit:
+    """
+    Counts the renders of the preview caused by each action, such as
+    starting the application or changing a parameter. Renders are counted
+    for the last action that began before them, and ``report(action,
+    renders)`` is called once the next action begins.
+    """
+
+    def __init__(self, report=None):
+        self.report = report
+        self.action = None
+        self.renders = 0
+        self.total = 0
+
+    def begin(self, action: str):
+        self.finish()
+        self.action = action
+
+    def count_render(self):
+        self.renders += 1
+        self.total += 1
+
+    def finish(self):
+        if self.action is not None and self.report is not None:
+            self.report(self.action, self.renders)
+        self.action = None
+        self.renders = 0
+
+
+def print_renders(action: str, renders: int):
+    print(f"{renders} render(s) for {action}", file=sys.stderr)
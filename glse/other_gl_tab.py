@@ -2,13 +2,11 @@ from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QFrame,
     QLabel,
-    QScrollArea,
     QTabWidget,
     QVBoxLayout,
-    QWidget,
 )
 
-from .widgets import Activator, ColorPickerWidget, Dropdown, Slider
+from .widgets import Activator, ColorPickerWidget, Dropdown, LazyTab, Slider
 
 
 def create_other_gl_tab(window):
@@ -16,44 +14,16 @@ def create_other_gl_tab(window):
     tabWidget = QTabWidget()
 
     # point tab
-    pointTabLayout = create_point_tab(window)
-    pointTab = QWidget()
-    pointTab.setLayout(pointTabLayout)
-    pointTabScrollArea = QScrollArea()
-    pointTabScrollArea.setWidgetResizable(True)
-    pointTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    pointTabScrollArea.setWidget(pointTab)
-    tabWidget.addTab(pointTabScrollArea, "Point")
+    tabWidget.addTab(LazyTab(window, create_point_tab), "Point")
 
     # text tab
-    textTabLayout = create_text_tab(window)
-    textTab = QWidget()
-    textTab.setLayout(textTabLayout)
-    textTabScrollArea = QScrollArea()
-    textTabScrollArea.setWidgetResizable(True)
-    textTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    textTabScrollArea.setWidget(textTab)
-    tabWidget.addTab(textTabScrollArea, "Text")
+    tabWidget.addTab(LazyTab(window, create_text_tab), "Text")
 
     # table tab
-    tableTabLayout = create_table_tab(window)
-    tableTab = QWidget()
-    tableTab.setLayout(tableTabLayout)
-    tableTabScrollArea = QScrollArea()
-    tableTabScrollArea.setWidgetResizable(True)
-    tableTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    tableTabScrollArea.setWidget(tableTab)
-    tabWidget.addTab(tableTabScrollArea, "Table")
+    tabWidget.addTab(LazyTab(window, create_table_tab), "Table")
 
     # Hlines and Vlines tab
-    hlinesVlinesTabLayout = create_hlines_vlines_tab(window)
-    hlinesVlinesTab = QWidget()
-    hlinesVlinesTab.setLayout(hlinesVlinesTabLayout)
-    hlinesVlinesTabScrollArea = QScrollArea()
-    hlinesVlinesTabScrollArea.setWidgetResizable(True)
-    hlinesVlinesTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    hlinesVlinesTabScrollArea.setWidget(hlinesVlinesTab)
-    tabWidget.addTab(hlinesVlinesTabScrollArea, "Hlines and Vlines")
+    tabWidget.addTab(LazyTab(window, create_hlines_vlines_tab), "Hlines and Vlines")
 
     layout.addWidget(tabWidget)
     window.otherGLTab.setLayout(layout)
@@ -77,6 +47,7 @@ def create_point_tab(window):
         initial_color=initial_color,
         param_ids=["Point", ["_color"]],
         activated_on_init=window.params["Point"]["_color"] is not None,
+        fallback_color="black",
     )
     color_activator = Activator(
         window=window,
@@ -98,6 +69,7 @@ def create_point_tab(window):
         initial_color=edge_initial_color,
         param_ids=["Point", ["_edge_color"]],
         activated_on_init=window.params["Point"]["_edge_color"] is not None,
+        fallback_color="black",
     )
     edge_color_activator = Activator(
         window=window,
@@ -120,6 +92,7 @@ def create_point_tab(window):
         initial_color=initial_color,
         param_ids=["Point", ["_text_color"]],
         activated_on_init=True,
+        fallback_color="black",
     )
     text_color_activator = Activator(
         window,
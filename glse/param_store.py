@@ -0,0 +1,162 @@
+from collections import defaultdict
+
+# Value of the unsaved changes removing a parameter of the saved style
+_REMOVED = object()
+
+
+class ParamStore:
+    """
+    Owns the style parameters being edited and the baseline they were loaded
+    or saved as. Sections are copied on the first write after a snapshot, so
+    snapshots are never modified and unchanged sections are shared between
+    them. Changed parameters are tracked as they are written.
+    """
+
+    def __init__(self, params: dict | None = None):
+        self.subscribers = defaultdict(list)
+        self.reset(params or {})
+
+    def reset(self, params: dict, saved: bool = True):
+        """
+        Replace every parameter without notifying the subscribers. The new
+        parameters are the baseline, unless they were never saved, in which
+        case they are all unsaved changes.
+        """
+        self.sections = {section: dict(values) for section, values in params.items()}
+        self.shared = set()
+        self.snapshot_cache = None
+        if saved:
+            self.baseline = self.snapshot()
+            self.dirty = {}
+        else:
+            self.baseline = {}
+            self.dirty = {
+                (section, key): value
+                for section, values in self.sections.items()
+                for key, value in values.items()
+            }
+
+    def snapshot(self) -> dict:
+        """
+        The current parameters, which must not be modified. Snapshots are
+        only copied again after a write.
+        """
+        if self.snapshot_cache is None:
+            self.snapshot_cache = dict(self.sections)
+            self.shared = set(self.sections)
+        return self.snapshot_cache
+
+    def restore(self, snapshot: dict):
+        """
+        Make a snapshot of this store the current parameters again, notifying
+        the subscribers of the parameters it changes. The baseline is kept.
+        """
+        current = self.snapshot()
+        self.sections = dict(snapshot)
+        self.shared = set(snapshot)
+        self.snapshot_cache = snapshot
+        for section in current.keys() | snapshot.keys():
+            before, after = current.get(section, {}), snapshot.get(section, {})
+            if before is after:
+                continue
+            for key in before.keys() | after.keys():
+                value = after.get(key, _REMOVED)
+                if before.get(key, _REMOVED) != value:
+                    self.track(section, key, value)
+                    self.notify(section, key, None if value is _REMOVED else value)
+
+    def get(self, section: str, key: str, default=None):
+        return self.sections.get(section, {}).get(key, default)
+
+    def baseline_value(self, section: str, key: str, default=None):
+        return self.baseline.get(section, {}).get(key, default)
+
+    def set(self, section: str, key: str, value) -> bool:
+        """
+        Set a parameter, returns whether its value changed.
+        """
+        values = self.sections.get(section, {})
+        if key in values and values[key] == value:
+            return False
+        self.writable(section)[key] = value
+        self.track(section, key, value)
+        self.notify(section, key, value)
+        return True
+
+    def remove(self, section: str, key: str) -> bool:
+        if key not in self.sections.get(section, {}):
+            return False
+        del self.writable(section)[key]
+        self.track(section, key, _REMOVED)
+        self.notify(section, key, None)
+        return True
+
+    def writable(self, section: str) -> dict:
+        if section in self.shared:
+            self.sections[section] = dict(self.sections[section])
+            self.shared.discard(section)
+        elif section not in self.sections:
+            self.sections[section] = {}
+        self.snapshot_cache = None
+        return self.sections[section]
+
+    def track(self, section: str, key: str, value):
+        baseline = self.baseline.get(section, {})
+        if value is _REMOVED:
+            unchanged = key not in baseline
+        else:
+            unchanged = key in baseline and baseline[key] == value
+        if unchanged:
+            self.dirty.pop((section, key), None)
+        else:
+            self.dirty[(section, key)] = value
+
+    def changed_since(self, snapshot: dict | None, keys) -> list[tuple[str, str]]:
+        """
+        The ``(section, key)`` parameters among ``keys`` whose value differs
+        from ``snapshot``, without duplicates.
+        """
+        if snapshot is None:
+            return list(dict.fromkeys(keys))
+        current = self.snapshot()
+        changed = []
+        for section, key in dict.fromkeys(keys):
+            before, after = snapshot.get(section, {}), current.get(section, {})
+            # Sections that weren't written to are shared with the snapshot
+            if before is after:
+                continue
+            if before.get(key, _REMOVED) != after.get(key, _REMOVED):
+                changed.append((section, key))
+        return changed
+
+    def mark_saved(self):
+        self.baseline = self.snapshot()
+        self.dirty = {}
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self.dirty)
+
+    def unsaved_changes(self) -> dict:
+        """
+        The changed parameters by section, removed parameters are None.
+        """
+        changes = {}
+        for (section, key), value in self.dirty.items():
+            changes.setdefault(section, {})[key] = None if value is _REMOVED else value
+        return changes
+
+    def subscribe(self, callback, section: str | None = None, key: str | None = None):
+        """
+        Call ``callback(section, key, value)`` when a parameter changes. Without
+        a section or key, it is called for every section or every key.
+        """
+        self.subscribers[(section, key)].append(callback)
+
+    def unsubscribe(self, callback, section: str | None = None, key: str | None = None):
+        self.subscribers[(section, key)].remove(callback)
+
+    def notify(self, section: str, key: str, value):
+        for subscription in ((section, key), (section, None), (None, None)):
+            for callback in self.subscribers.get(subscription, ()):
+                callback(section, key, value)
@@ -0,0 +1,14 @@
+import os
+
+from platformdirs import user_cache_dir
+
+
+def cache_dir(*subdirs: str) -> str:
+    """
+    Return a directory inside the GLSE user cache directory, creating it if needed.
+    The location can be overridden with the GLSE_CACHE_DIR environment variable.
+    """
+    root = os.environ.get("GLSE_CACHE_DIR") or user_cache_dir("glse")
+    path = os.path.join(root, *subdirs)
+    os.makedirs(path, exist_ok=True)
+    return path
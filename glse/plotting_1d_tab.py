@@ -3,10 +3,8 @@ from PySide6.QtWidgets import (
     QFrame,
     QLabel,
     QMainWindow,
-    QScrollArea,
     QTabWidget,
     QVBoxLayout,
-    QWidget,
 )
 
 
@@ -16,6 +14,7 @@ from .widgets import (
     CheckBox,
     ColorPickerWidget,
     Dropdown,
+    LazyTab,
     Slider,
 )
 
@@ -25,34 +24,13 @@ def create_plotting_1d_tab(window: QMainWindow):
     tabWidget = QTabWidget()
 
     # curve tab
-    curveTabLayout = create_curve_tab(window)
-    curveTab = QWidget()
-    curveTab.setLayout(curveTabLayout)
-    curveTabScrollArea = QScrollArea()
-    curveTabScrollArea.setWidgetResizable(True)
-    curveTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    curveTabScrollArea.setWidget(curveTab)
-    tabWidget.addTab(curveTabScrollArea, "Curve")
+    tabWidget.addTab(LazyTab(window, create_curve_tab), "Curve")
 
     # scatter tab
-    scatterTabLayout = create_scatter_tab(window)
-    scatterTab = QWidget()
-    scatterTab.setLayout(scatterTabLayout)
-    scatterTabScrollArea = QScrollArea()
-    scatterTabScrollArea.setWidgetResizable(True)
-    scatterTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    scatterTabScrollArea.setWidget(scatterTab)
-    tabWidget.addTab(scatterTabScrollArea, "Scatter")
+    tabWidget.addTab(LazyTab(window, create_scatter_tab), "Scatter")
 
     # histogram tab
-    histogramTabLayout = create_histogram_tab(window)
-    histogramTab = QWidget()
-    histogramTab.setLayout(histogramTabLayout)
-    histogramTabScrollArea = QScrollArea()
-    histogramTabScrollArea.setWidgetResizable(True)
-    histogramTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    histogramTabScrollArea.setWidget(histogramTab)
-    tabWidget.addTab(histogramTabScrollArea, "Histogram")
+    tabWidget.addTab(LazyTab(window, create_histogram_tab), "Histogram")
 
     layout.addWidget(tabWidget)
     window.plotting1DTab.setLayout(layout)
@@ -103,6 +81,7 @@ def create_curve_tab(window: QMainWindow):
         initial_fill_under_color,
         param_ids=["Curve", ["_fill_between_color"]],
         activated_on_init=False,
+        fallback_color="#000000",
     )
     fill_under_color_checkbox = Activator(
         window,
@@ -171,6 +150,7 @@ def create_curve_tab(window: QMainWindow):
         errorbars_initial_color,
         ["Curve", ["_errorbars_color"]],
         activated_on_init=window.params["Curve"]["_errorbars_color"] != "same as curve",
+        fallback_color="#000000",
     )
     errorbars_color_checkbox = Activator(
         window,
@@ -230,6 +210,7 @@ def create_curve_tab(window: QMainWindow):
         ["Curve", ["_error_curves_color"]],
         activated_on_init=window.params["Curve"]["_error_curves_color"]
         != "same as curve",
+        fallback_color="#000000",
     )
     error_curves_color_checkbox = Activator(
         window,
@@ -306,6 +287,7 @@ def create_scatter_tab(window: QMainWindow):
             if window.params["Scatter"]["_face_color"] in (None, "color cycle")
             else True
         ),
+        fallback_color="#000000",
     )
     marker_face_color_checkbox = ActivatorDropdown(
         window,
@@ -329,6 +311,7 @@ def create_scatter_tab(window: QMainWindow):
         activated_on_init=(
             False if window.params["Scatter"]["_edge_color"] == "none" else True
         ),
+        fallback_color="#000000",
     )
     marker_edge_color_checkbox = ActivatorDropdown(
         window,
@@ -393,6 +376,7 @@ def create_scatter_tab(window: QMainWindow):
         errorbars_intitial_color,
         ["Scatter", ["_errorbars_color"]],
         "same as" not in window.params["Scatter"]["_errorbars_color"],
+        fallback_color="#000000",
     )
     errorbars_color_checkbox = Activator(
         window,
@@ -2,10 +2,8 @@ from matplotlib import colormaps
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QMainWindow,
-    QScrollArea,
     QTabWidget,
     QVBoxLayout,
-    QWidget,
 )
 
 from .widgets import (
@@ -13,6 +11,7 @@ from .widgets import (
     CheckBox,
     ColorPickerWidget,
     Dropdown,
+    LazyTab,
     ListOptions,
     Slider,
 )
@@ -23,44 +22,16 @@ def create_plotting_2d_tab(window: QMainWindow):
     tabWidget = QTabWidget()
 
     # contour tab
-    contourTabLayout = create_contour_tab(window)
-    contourTab = QWidget()
-    contourTab.setLayout(contourTabLayout)
-    contourTabScrollArea = QScrollArea()
-    contourTabScrollArea.setWidgetResizable(True)
-    contourTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    contourTabScrollArea.setWidget(contourTab)
-    tabWidget.addTab(contourTabScrollArea, "Contour")
+    tabWidget.addTab(LazyTab(window, create_contour_tab), "Contour")
 
     # heatmap tab
-    heatmapTabLayout = create_heatmap_tab(window)
-    heatmapTab = QWidget()
-    heatmapTab.setLayout(heatmapTabLayout)
-    heatmapTabScrollArea = QScrollArea()
-    heatmapTabScrollArea.setWidgetResizable(True)
-    heatmapTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    heatmapTabScrollArea.setWidget(heatmapTab)
-    tabWidget.addTab(heatmapTabScrollArea, "Heatmap")
+    tabWidget.addTab(LazyTab(window, create_heatmap_tab), "Heatmap")
 
     # stream tab
-    streamTabLayout = create_stream_tab(window)
-    streamTab = QWidget()
-    streamTab.setLayout(streamTabLayout)
-    streamTabScrollArea = QScrollArea()
-    streamTabScrollArea.setWidgetResizable(True)
-    streamTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    streamTabScrollArea.setWidget(streamTab)
-    tabWidget.addTab(streamTabScrollArea, "Stream")
+    tabWidget.addTab(LazyTab(window, create_stream_tab), "Stream")
 
     # vectorfield tab
-    vectorFieldTabLayout = create_vectorfield_tab(window)
-    vectorFieldTab = QWidget()
-    vectorFieldTab.setLayout(vectorFieldTabLayout)
-    vectorFieldTabScrollArea = QScrollArea()
-    vectorFieldTabScrollArea.setWidgetResizable(True)
-    vectorFieldTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    vectorFieldTabScrollArea.setWidget(vectorFieldTab)
-    tabWidget.addTab(vectorFieldTabScrollArea, "VectorField")
+    tabWidget.addTab(LazyTab(window, create_vectorfield_tab), "VectorField")
 
     layout.addWidget(tabWidget)
     window.plotting2DTab.setLayout(layout)
@@ -212,6 +183,7 @@ def create_stream_tab(window: QMainWindow):
         initial_color=initial_color,
         param_ids=["Stream", ["_color"]],
         activated_on_init=window.params["Stream"]["_color"] is not None,
+        fallback_color="#000000",
     )
     activator = Activator(
         window,
@@ -272,6 +244,7 @@ def create_vectorfield_tab(window: QMainWindow):
         initial_color=initial_color,
         param_ids=["VectorField", ["_color"]],
         activated_on_init=window.params["VectorField"]["_color"] is not None,
+        fallback_color="#000000",
     )
 
     layout.addWidget(color_picker)
@@ -0,0 +1,141 @@
+import time
+
+from PySide6.QtCore import QObject, QRect, QSize, Qt, QThread, Signal, Slot
+from PySide6.QtGui import QColor, QImage, QPainter
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+from .rendering import FigureRenderer, RenderRequest
+
+
+class RenderWorker(QObject):
+    """
+    Renders figures on a background thread. Requests older than the latest
+    generation are skipped, so the preview always converges to the newest
+    parameters.
+    """
+
+    finished = Signal(object)
+
+    def __init__(self, renderer: FigureRenderer):
+        super().__init__()
+        self.renderer = renderer
+        # Set by the GUI thread when user scripts must run in a SandboxPool
+        self.sandbox = None
+        # Written by the GUI thread, only read here
+        self.latest_generation = 0
+        self.superseded_count = 0
+        # Requests taken off the queue, rendered or not
+        self.handled_count = 0
+
+    @Slot(object)
+    def render(self, request: RenderRequest):
+        self.handled_count += 1
+        if self.is_superseded(request.generation):
+            self.superseded_count += 1
+            return
+        renderer = self.renderer
+        if request.sandboxed and self.sandbox is not None:
+            renderer = self.sandbox
+        result = renderer.render(
+            request, superseded=lambda: self.is_superseded(request.generation)
+        )
+        if result.ok or result.error or not self.is_superseded(request.generation):
+            self.finished.emit(result)
+        else:
+            self.superseded_count += 1
+
+    def is_superseded(self, generation: int) -> bool:
+        return generation < self.latest_generation
+
+
+class RenderThread(QThread):
+    """
+    Thread owning a RenderWorker, requests are queued through ``requested``.
+    """
+
+    requested = Signal(object)
+
+    def __init__(self, renderer: FigureRenderer, parent=None):
+        super().__init__(parent)
+        self.worker = RenderWorker(renderer)
+        self.worker.moveToThread(self)
+        self.requested.connect(self.worker.render)
+
+    def stop(self):
+        self.quit()
+        self.wait()
+
+
+class PreviewWidget(QWidget):
+    """
+    Lightweight widget displaying the RGBA buffer of a rendered figure.
+    """
+
+    resized = Signal()
+    # Seconds between a result being set and the end of its first paint
+    swapped = Signal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(100, 100)
+        self.image = None
+        self.result = None
+        self.error = None
+        self.swap_start = None
+
+    def set_result(self, result):
+        # The QImage shares the Agg buffer, keep the result alive while it is shown
+        image = QImage(
+            result.buffer,
+            result.width,
+            result.height,
+            result.width * 4,
+            QImage.Format_RGBA8888,
+        )
+        image.setDevicePixelRatio(result.pixel_ratio)
+        self.swap_start = time.perf_counter()
+        self.result = result
+        self.image = image
+        self.error = None
+        self.update()
+
+    def set_error(self, message: str):
+        self.error = message
+        self.update()
+
+    def sizeHint(self):
+        # Same default as a matplotlib canvas (6.4 x 4.8 inches at 100 dpi)
+        return QSize(640, 480)
+
+    def pixel_size(self) -> tuple[int, int]:
+        ratio = self.devicePixelRatioF()
+        return int(self.width() * ratio), int(self.height() * ratio)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self.image is not None:
+            ratio = self.image.devicePixelRatio()
+            image_size = self.image.size() / ratio
+            if image_size == self.size():
+                painter.drawImage(0, 0, self.image)
+            else:
+                # Stretch the last image until the render at the new size arrives
+                painter.setRenderHint(QPainter.SmoothPixmapTransform)
+                painter.drawImage(self.rect(), self.image)
+        if self.error:
+            painter.fillRect(self.rect(), QColor(0, 0, 0, 170))
+            painter.setPen(QColor("#ff8080"))
+            painter.drawText(
+                QRect(10, 10, self.width() - 20, self.height() - 20),
+                Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap,
+                self.error,
+            )
+        painter.end()
+        if self.swap_start is not None:
+            self.swapped.emit(time.perf_counter() - self.swap_start)
+            self.swap_start = None
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+from .render_cache import DiskRenderCache
+from .rendering import RenderRequest, RenderResult
+
+
+def _pixels_of(result: RenderResult, request: RenderRequest) -> RenderResult:
+    # Keep the pixels, not the figure they were drawn from
+    pixels = RenderResult(request)
+    pixels.chosen = result.chosen
+    pixels.figure_names = result.figure_names
+    pixels.dependencies = result.dependencies
+    pixels.buffer = result.buffer
+    pixels.width = result.width
+    pixels.height = result.height
+    pixels.pixel_ratio = result.pixel_ratio
+    return pixels
+
+
+def _from_disk(entry: dict, request: RenderRequest) -> RenderResult:
+    result = RenderResult(request)
+    result.chosen = entry["chosen"]
+    result.figure_names = entry["figure_names"]
+    result.dependencies = entry["dependencies"]
+    result.buffer = entry["buffer"]
+    result.width = entry["width"]
+    result.height = entry["height"]
+    result.pixel_ratio = entry["pixel_ratio"]
+    return result
+
+
+def params_hash(params: dict) -> str:
+    # Sorting the keys makes the hash independent of the insertion order
+    canonical = json.dumps(params, sort_keys=True, default=repr)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+class PreviewCache:
+    """
+    Bounded LRU of rendered previews. The size of the cache is accounted in
+    bytes of pixels, the least recently used previews are evicted first when
+    it exceeds ``max_bytes``.
+    Previews missing from memory are looked up in the ``disk`` cache if
+    given, which keeps them across sessions.
+    """
+
+    def __init__(
+        self, max_bytes: int = 256 * 1024**2, disk: DiskRenderCache | None = None
+    ):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.script_hashes = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def script_hash(self, filepath: str) -> str:
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = self.script_hashes.get(filepath)
+        if cached is None or cached[0] != stamp:
+            with open(filepath, "rb") as file:
+                cached = (stamp, hashlib.sha1(file.read()).hexdigest())
+            self.script_hashes[filepath] = cached
+        return cached[1]
+
+    def key(self, request: RenderRequest) -> tuple:
+        return (
+            self.script_hash(request.filepath),
+            request.chosen,
+            params_hash(request.params),
+            request.width,
+            request.height,
+            request.pixel_ratio,
+        )
+
+    def get(
+        self, request: RenderRequest, key: tuple | None = None
+    ) -> RenderResult | None:
+        """
+        Return the cached preview of ``request`` as a result of the request,
+        or None if it was never rendered. The ``key`` of the request can be
+        given when it is already known, it is only trusted while the script
+        it was computed for is unchanged.
+        """
+        try:
+            if key is None or key[0] != self.script_hash(request.filepath):
+                key = self.key(request)
+        except OSError:
+            self.misses += 1
+            return None
+        entry = self.entries.get(key)
+        if entry is None and self.disk is not None:
+            disk_entry = self.disk.get(key)
+            if disk_entry is not None:
+                entry = _from_disk(disk_entry, request)
+                self._insert(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        result = _pixels_of(entry, request)
+        result.from_cache = True
+        return result
+
+    def put(self, result: RenderResult) -> tuple | None:
+        """
+        Cache the preview of ``result`` and return its key, or None when it
+        is not worth caching.
+        """
+        # Only full quality renders are worth revisiting
+        if not result.ok or result.request.draft:
+            return None
+        try:
+            key = self.key(result.request)
+        except OSError:
+            return None
+        if key in self.entries:
+            return key
+        entry = _pixels_of(result, result.request)
+        self._insert(key, entry)
+        if self.disk is not None:
+            # Compressed and written on a background thread
+            self.disk.put_later(key, vars(entry))
+        return key
+
+    def _insert(self, key, entry: RenderResult):
+        nbytes = entry.width * entry.height * 4
+        if nbytes > self.max_bytes:
+            return
+        self.discard(key)
+        self.entries[key] = entry
+        self.nbytes += nbytes
+        self.evict()
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.width * entry.height * 4
+
+    def evict(self):
+        while self.nbytes > self.max_bytes and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.nbytes -= entry.width * entry.height * 4
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
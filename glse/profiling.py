@@ -0,0 +1,149 @@
+import cProfile
+import functools
+import os
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .paths import cache_dir
+
+# Number of updates to profile from startup, e.g. GLSE_PROFILE=20
+PROFILE_ENV = "GLSE_PROFILE"
+# Directory the profiles are written to, the user cache directory by default
+PROFILE_DIR_ENV = "GLSE_PROFILE_DIR"
+
+# The profiler of the running GUI, if any
+active_profiler = None
+
+
+def frame_name(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        # Built-in functions
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats, min_time: float = 1e-5) -> list[str]:
+    """
+    Convert a profile to the collapsed stack format read by flamegraph tools,
+    one ``frame;frame;frame microseconds`` line per stack. cProfile only
+    records callers, so the time of a function is split between the stacks
+    leading to it in proportion to the time it spent under each caller.
+    """
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees[caller][func] = cumulative
+
+    totals = defaultdict(float)
+
+    def walk(func, stack, scale):
+        _, _, own, cumulative, _ = stats.stats[func]
+        stack = stack + (func,)
+        if own * scale >= min_time:
+            totals[stack] += own * scale
+        for callee, time_under_func in callees[func].items():
+            if callee in stack:
+                continue
+            callee_cumulative = stats.stats[callee][3]
+            if callee_cumulative <= 0:
+                continue
+            callee_time = time_under_func * scale
+            if callee_time >= min_time:
+                walk(callee, stack, callee_time / callee_cumulative)
+
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            walk(func, (), 1.0)
+
+    return [
+        ";".join(frame_name(func) for func in stack) + f" {round(seconds * 1e6)}"
+        for stack, seconds in totals.items()
+        if round(seconds * 1e6) > 0
+    ]
+
+
+class UpdateProfiler:
+    """
+    Profiles the next ``count`` updates of the figure with cProfile, from
+    the parameter change to the preview being set. ``on_finished`` is called
+    with the paths of the .pstats and collapsed stacks files once done.
+    """
+
+    def __init__(self, count: int, on_finished=None, output_dir: str | None = None):
+        self.remaining = count
+        self.on_finished = on_finished
+        self.output_dir = (
+            output_dir or os.environ.get(PROFILE_DIR_ENV) or cache_dir("profiles")
+        )
+        self.profile = cProfile.Profile()
+        self.depth = 0
+
+    @contextmanager
+    def profiling(self):
+        # Re-entrant, profiled methods call each other
+        if self.depth == 0:
+            self.profile.enable()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                self.profile.disable()
+                if self.remaining <= 0:
+                    stop_profiling()
+
+    def count_update(self):
+        self.remaining -= 1
+
+    def write(self) -> tuple[str, str]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stem = os.path.join(
+            self.output_dir, time.strftime("glse-update-%Y%m%d-%H%M%S")
+        )
+        self.profile.dump_stats(stem + ".pstats")
+        with open(stem + ".folded", "w") as file:
+            for line in collapsed_stacks(pstats.Stats(self.profile)):
+                file.write(line + "\n")
+        return stem + ".pstats", stem + ".folded"
+
+
+def start_profiling(count: int, on_finished=None) -> UpdateProfiler:
+    global active_profiler
+    active_profiler = UpdateProfiler(count, on_finished)
+    return active_profiler
+
+
+def stop_profiling():
+    global active_profiler
+    profiler, active_profiler = active_profiler, None
+    if profiler is None:
+        return
+    paths = profiler.write()
+    if profiler.on_finished is not None:
+        profiler.on_finished(paths)
+
+
+def profiled(method=None, *, counts_update=False):
+    """
+    Run the decorated method under the active update profiler, if any.
+    With ``counts_update``, each call counts as one of the profiled updates.
+    """
+    if method is None:
+        return functools.partial(profiled, counts_update=counts_update)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        profiler = active_profiler
+        if profiler is None:
+            return method(*args, **kwargs)
+        with profiler.profiling():
+            result = method(*args, **kwargs)
+            if counts_update:
+                profiler.count_update()
+        return result
+
+    return wrapper
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+
+from .dependencies import FigureDependencies
+
+MAGIC = b"GLSERC1\n"
+SUFFIX = ".render"
+
+
+def _package_version(name: str) -> str:
+    # Read from the metadata, importing the packages is slow
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class DiskRenderCache:
+    """
+    Content-addressed cache of rendered previews shared by every GLSE process.
+
+    Entries are keyed by the hash of the script source, the figure, the style
+    parameters (which include the dpi), the size in pixels, the pixel ratio
+    and the GraphingLib and matplotlib versions. They are written atomically,
+    so concurrent processes only ever see complete entries, and the least
+    recently accessed ones are removed once the cache exceeds ``max_bytes``.
+    Entries given to ``put_later`` are written and pruned on a background
+    thread, in the order they are given.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024**2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.versions = (
+            _package_version("graphinglib"),
+            _package_version("matplotlib"),
+        )
+        # Estimate of the size on disk, other processes also write entries
+        self.nbytes = None
+        self.executor = None
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key: tuple) -> str:
+        digest = hashlib.sha1(repr(key + self.versions).encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + SUFFIX)
+
+    def get(self, key: tuple) -> dict | None:
+        """
+        Return the entry stored for ``key``, a dict with the pixels and the
+        metadata of the render, or None.
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            entry = self._decode(data)
+        except (OSError, ValueError, KeyError, zlib.error, struct.error):
+            # Missing, being evicted by another process or corrupted
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.submit(self._touch, path)
+        return entry
+
+    def _touch(self, path):
+        try:
+            # The modification time doubles as the access time, atime is
+            # rarely updated on modern mounts
+            os.utime(path)
+        except OSError:
+            pass
+
+    def submit(self, function, *args):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(1, thread_name_prefix="render-cache")
+        self.executor.submit(function, *args)
+
+    def put_later(self, key: tuple, entry: dict):
+        self.submit(self.put, key, entry)
+
+    def put(self, key: tuple, entry: dict):
+        path = self.path(key)
+        data = self._encode(entry)
+        if self.nbytes is None:
+            # Counted once, then kept up to date by the writes
+            self.nbytes = self.size()
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            # Write to a temporary file first so that concurrent readers never
+            # see a partially written entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk cache is only an optimization
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return
+        self.nbytes += len(data) - replaced
+        if self.nbytes > self.max_bytes:
+            # Leave some room so that the next writes don't prune again
+            self.prune(int(self.max_bytes * 0.9))
+
+    def close(self):
+        # Finish writing the pending entries
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def _encode(self, entry: dict) -> bytes:
+        header = {
+            "chosen": entry["chosen"],
+            "figure_names": entry["figure_names"],
+            "dependencies": {
+                name: dependencies.to_json()
+                for name, dependencies in entry["dependencies"].items()
+            },
+            "width": entry["width"],
+            "height": entry["height"],
+            "pixel_ratio": entry["pixel_ratio"],
+        }
+        header = json.dumps(header).encode()
+        pixels = zlib.compress(bytes(entry["buffer"]), 1)
+        return MAGIC + struct.pack("<I", len(header)) + header + pixels
+
+    def _decode(self, data: bytes) -> dict:
+        if not data.startswith(MAGIC):
+            raise ValueError("Not a render cache entry")
+        offset = len(MAGIC)
+        (header_size,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        entry = json.loads(data[offset : offset + header_size])
+        entry["dependencies"] = {
+            name: FigureDependencies.from_json(dependencies)
+            for name, dependencies in entry["dependencies"].items()
+        }
+        entry["buffer"] = zlib.decompress(data[offset + header_size :])
+        if len(entry["buffer"]) != entry["width"] * entry["height"] * 4:
+            raise ValueError("Truncated render cache entry")
+        return entry
+
+    def files(self) -> list:
+        """
+        Return ``(path, size, access time)`` for every entry, least recently
+        accessed first.
+        """
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.endswith(SUFFIX):
+                    files.append((path, stat.st_size, stat.st_mtime))
+                elif name.endswith(".tmp") and time.time() - stat.st_mtime > 3600:
+                    # Left behind by a process that died while writing
+                    self._remove(path)
+        files.sort(key=lambda file: file[2])
+        return files
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.files())
+
+    def prune(self, max_bytes: int | None = None, max_age: float | None = None) -> int:
+        """
+        Remove the least recently accessed entries until the cache fits in
+        ``max_bytes``, and the entries not accessed for ``max_age`` seconds.
+        Returns the number of bytes freed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        files = self.files()
+        total = sum(size for _, size, _ in files)
+        now = time.time()
+        freed = 0
+        for path, size, accessed in files:
+            too_old = max_age is not None and now - accessed > max_age
+            if total - freed <= max_bytes and not too_old:
+                continue
+            if self._remove(path):
+                freed += size
+        self.nbytes = total - freed
+        return freed
+
+    def clear(self) -> int:
+        return self.prune(max_bytes=0)
+
+    def _remove(self, path) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            # Already removed by another process
+            return False
+        return True
+
+    def stats(self) -> dict:
+        files = self.files()
+        return {
+            "directory": self.directory,
+            "entries": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            "oldest_access": files[0][2] if files else None,
+            "newest_access": files[-1][2] if files else None,
+        }
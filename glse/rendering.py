@@ -0,0 +1,366 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from copy import deepcopy
+
+import graphinglib as gl
+import matplotlib.pyplot as plt
+from matplotlib.backend_bases import GraphicsContextBase
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+
+from .code_cache import CodeCache
+from .dependencies import figure_dependencies
+from .restyle import PreparedFigure, capture_artists, restyle
+from .style_rc import apply_rc, scoped_rc, snapshot_rc, style_rc
+
+
+class RenderError(Exception):
+    pass
+
+
+class RenderRequest:
+    """
+    Everything needed to render a figure, independent of the GUI state.
+    """
+
+    def __init__(
+        self,
+        generation: int,
+        filepath: str,
+        chosen: str | None,
+        params: dict,
+        width: int,
+        height: int,
+        pixel_ratio: float = 1.0,
+        sandboxed: bool = False,
+        draft: bool = False,
+    ):
+        self.generation = generation
+        self.filepath = filepath
+        self.chosen = chosen
+        self.params = params
+        self.width = width
+        self.height = height
+        self.pixel_ratio = pixel_ratio
+        self.sandboxed = sandboxed
+        self.draft = draft
+
+
+class RenderResult:
+    """
+    Rendered RGBA pixels of a figure, or the reason why it could not be rendered.
+    """
+
+    def __init__(self, request: RenderRequest):
+        self.request = request
+        self.generation = request.generation
+        self.chosen = request.chosen
+        self.figure_names = []
+        # Figure name -> FigureDependencies, for every figure of the script
+        self.dependencies = {}
+        self.figure = None
+        self.buffer = None
+        self.width = 0
+        self.height = 0
+        # Device pixels per logical pixel of the buffer, lower for drafts
+        self.pixel_ratio = request.pixel_ratio
+        self.render_time = 0.0
+        # Served by a preview cache rather than rendered
+        self.from_cache = False
+        # Stage name -> seconds spent in it, see FigureRenderer.render
+        self.timings = {}
+        self.error = None
+
+    @property
+    def ok(self) -> bool:
+        return self.buffer is not None
+
+
+def dummy_show(*args, **kwargs):
+    pass
+
+
+def dummy_save(*args, **kwargs):
+    pass
+
+
+class DraftGraphicsContext(GraphicsContextBase):
+    """
+    Graphics context ignoring the antialiasing requested by the artists.
+    """
+
+    def set_antialiased(self, b):
+        self._antialiased = 0
+
+    def get_antialiased(self):
+        return 0
+
+
+class DraftRendererAgg(RendererAgg):
+    """
+    Agg renderer trading quality for speed: no antialiasing and aggressive
+    simplification of long paths.
+    """
+
+    def __init__(self, width, height, dpi, simplify_threshold: float):
+        super().__init__(width, height, dpi)
+        self.simplify_threshold = simplify_threshold
+
+    def new_gc(self):
+        return DraftGraphicsContext()
+
+    def draw_path(self, gc, path, transform, rgbFace=None):
+        if path.should_simplify:
+            path = path.copy()
+            path.simplify_threshold = self.simplify_threshold
+        super().draw_path(gc, path, transform, rgbFace)
+
+
+class DraftCanvasAgg(FigureCanvasAgg):
+    def __init__(self, figure, simplify_threshold: float):
+        super().__init__(figure)
+        self.simplify_threshold = simplify_threshold
+
+    def get_renderer(self):
+        w, h = self.get_width_height(physical=True)
+        key = w, h, self.figure.dpi
+        if self._lastKey != key:
+            self.renderer = DraftRendererAgg(
+                w, h, self.figure.dpi, self.simplify_threshold
+            )
+            self._lastKey = key
+        return self.renderer
+
+
+class FigureRenderer:
+    """
+    Executes figure scripts and renders their figures with the Agg backend.
+    It doesn't depend on Qt, so it can run on a worker thread or in another
+    process.
+    """
+
+    def __init__(
+        self,
+        code_cache: CodeCache | None = None,
+        draft_scale: float = 0.5,
+        draft_simplify_threshold: float = 1.0,
+    ):
+        self.code_cache = code_cache if code_cache is not None else CodeCache()
+        # Drafts are drawn at a fraction of the display resolution, whatever
+        # the savefig.dpi of the style
+        self.draft_scale = draft_scale
+        self.draft_simplify_threshold = draft_simplify_threshold
+        self.executed_scripts = {}
+        self.figure = None
+        # The figure last prepared, kept to restyle it in place
+        self.prepared = None
+        self.lock = threading.RLock()
+
+        # Figures are only drawn to Agg buffers, pyplot must not create GUI
+        # windows of its own for every figure GraphingLib prepares
+        plt.switch_backend("agg")
+
+    def load_figures(self, filepath: str, timings: dict | None = None) -> dict:
+        """
+        Execute a figure script and return the GraphingLib figures it creates
+        along with the style parameters they depend on.
+        The results are cached per script so that data generation and fitting
+        only happen once per session, style changes only restyle the figures.
+        The time spent compiling and executing the script is added to
+        ``timings`` if given.
+        """
+        start = time.perf_counter()
+        filepath = os.path.abspath(filepath)
+        code = self.code_cache.get(filepath)
+        compiled = time.perf_counter()
+        if timings is not None:
+            timings["compile"] = compiled - start
+            timings["exec"] = 0.0
+        executed = self.executed_scripts.get(filepath)
+        if executed is not None and executed["code"] is code:
+            return executed
+
+        original_show = gl.Figure.show
+        original_save = gl.Figure.save
+        original_multi_show = gl.MultiFigure.show
+        original_multi_save = gl.MultiFigure.save
+        gl.Figure.show = dummy_show
+        gl.Figure.save = dummy_save
+        gl.MultiFigure.show = dummy_show
+        gl.MultiFigure.save = dummy_save
+
+        # Execute the script
+        namespace = {"gl": gl, "__builtins__": __builtins__}
+        try:
+            exec(code, namespace, namespace)
+        finally:
+            gl.Figure.show = original_show
+            gl.Figure.save = original_save
+            gl.MultiFigure.show = original_multi_show
+            gl.MultiFigure.save = original_multi_save
+
+        # Check for figures in the namespace
+        figures = {}
+        for name, var in namespace.items():
+            if isinstance(var, gl.Figure) or isinstance(var, gl.MultiFigure):
+                figures[name] = var
+
+        executed = {
+            "code": code,
+            "namespace": namespace,
+            "figures": figures,
+            "dependencies": {
+                name: figure_dependencies(figure) for name, figure in figures.items()
+            },
+        }
+        self.executed_scripts[filepath] = executed
+        if timings is not None:
+            timings["exec"] = time.perf_counter() - compiled
+        return executed
+
+    def prepare_figure(self, gl_figure, params: dict) -> PreparedFigure:
+        # Plotting can modify the elements (e.g. histogram labels), so the
+        # cached figure is kept pristine and a copy of it is restyled
+        fig = deepcopy(gl_figure)
+        with capture_artists(fig) as artists:
+            if isinstance(fig, gl.MultiFigure):
+                fig._prepare_multi_figure()
+            elif isinstance(fig, gl.Figure):
+                fig.figure_style = "plain"
+                fig._prepare_figure(default_params=params)
+        # The figure is owned by the renderer from now on, detach it from pyplot
+        plt.close(fig._figure)
+        return PreparedFigure(gl_figure, fig, params, artists, snapshot_rc())
+
+    def restyle_figure(self, gl_figure, params: dict) -> PreparedFigure | None:
+        """
+        Apply the new parameters to the artists of the figure on display when
+        they are all cosmetic. Returns None when the figure must be prepared
+        again.
+        """
+        prepared = self.prepared
+        if prepared is None or prepared.source is not gl_figure:
+            return None
+        if prepared.figure is not self.figure:
+            return None
+        try:
+            # Start from the rc state the figure was prepared with
+            apply_rc(prepared.rc_params)
+            if restyle(prepared, params):
+                prepared.rc_params = snapshot_rc()
+                return prepared
+        except Exception:
+            # The figure is prepared again, which is slower but still correct
+            print("Restyling the figure in place failed:", file=sys.stderr)
+            traceback.print_exc()
+        return None
+
+    def draw(self, figure, width: int, height: int, dpi: float, draft=False):
+        figure.set_dpi(dpi)
+        figure.set_size_inches(width / dpi, height / dpi)
+        if draft:
+            canvas = DraftCanvasAgg(figure, self.draft_simplify_threshold)
+        else:
+            canvas = FigureCanvasAgg(figure)
+        canvas.draw()
+        return canvas.buffer_rgba()
+
+    def render(self, request: RenderRequest, superseded=None) -> RenderResult:
+        """
+        Render the requested figure. ``superseded`` is an optional callable
+        checked between stages, rendering stops early if it returns True.
+        The duration of each stage is recorded in the timings of the result,
+        a handful of clock reads that are negligible next to a draw.
+        """
+        result = RenderResult(request)
+        start = time.perf_counter()
+        with self.lock:
+            try:
+                rc = style_rc(request.params)
+                # Nothing done by the script or GraphingLib leaks out of the
+                # render, and nothing done elsewhere leaks into it
+                with scoped_rc(rc):
+                    executed = self.load_figures(request.filepath, result.timings)
+                    figures = executed["figures"]
+                    result.figure_names = list(figures.keys())
+                    result.dependencies = executed["dependencies"]
+                    if result.chosen is None:
+                        if len(figures) != 1:
+                            # Let the caller choose which figure to display
+                            return result
+                        result.chosen = result.figure_names[0]
+                    if superseded is not None and superseded():
+                        return result
+
+                    gl_figure = figures[result.chosen]
+                    prepare_start = time.perf_counter()
+                    prepared = self.restyle_figure(gl_figure, request.params)
+                    if prepared is None:
+                        # Start from the rc state of the style alone
+                        apply_rc(rc)
+                        prepared = self.prepare_figure(gl_figure, request.params)
+                        if superseded is not None and superseded():
+                            prepared.figure.clear()
+                            return result
+
+                    draw_start = time.perf_counter()
+                    result.timings["prepare"] = draw_start - prepare_start
+                    figure = prepared.figure
+                    width, height = request.width, request.height
+                    if request.draft:
+                        result.pixel_ratio *= self.draft_scale
+                        width = max(1, round(width * self.draft_scale))
+                        height = max(1, round(height * self.draft_scale))
+                    dpi = prepared.dpi * result.pixel_ratio
+                    # The layout only depends on the size in inches
+                    layout = (round(width / dpi, 2), round(height / dpi, 2))
+                    if prepared.layout != layout:
+                        prepared.thaw_layout()
+                    result.buffer = self.draw(figure, width, height, dpi, request.draft)
+                    prepared.freeze_layout(layout)
+                    result.timings["draw"] = time.perf_counter() - draw_start
+                    result.height, result.width = result.buffer.shape[:2]
+                    result.figure = figure
+                    self.set_current_figure(figure)
+                    self.prepared = prepared
+            except Exception:
+                result.error = traceback.format_exc()
+        result.render_time = time.perf_counter() - start
+        return result
+
+    def save(
+        self,
+        request: RenderRequest,
+        filepath: str,
+        format: str,
+        width: float,
+        height: float,
+        dpi,
+    ):
+        """
+        Save the figure of ``request`` with the given size in inches. The
+        preview on display may come from a cache, so it is rendered again.
+        """
+        with self.lock:
+            result = self.render(request)
+            if not result.ok:
+                raise RenderError(result.error or "There is no figure to save")
+            with scoped_rc(self.prepared.rc_params):
+                # Lay the figure out for the saved size
+                self.prepared.thaw_layout()
+                figure = self.figure
+                original_size = figure.get_size_inches()
+                figure.set_size_inches(width, height)
+                figure.savefig(filepath, format=format, dpi=dpi)
+                figure.set_size_inches(original_size)
+
+    def set_current_figure(self, figure):
+        old_figure = self.figure
+        self.figure = figure
+        if self.prepared is not None and self.prepared.figure is not figure:
+            self.prepared = None
+        if old_figure is not None and old_figure is not figure:
+            # Release the artists of the previous figure right away
+            old_figure.clear()
@@ -0,0 +1,680 @@
+from contextlib import contextmanager
+
+import graphinglib as gl
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.contour import ContourSet
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+from matplotlib.patches import FancyArrowPatch, Patch
+from matplotlib.quiver import Quiver
+from matplotlib.text import Annotation, Text
+
+
+class PreparedFigure:
+    """
+    A GraphingLib figure prepared with a given set of style parameters,
+    together with the matplotlib artists created by each of its elements.
+    """
+
+    def __init__(
+        self, source, gl_figure, params: dict, artists: dict, rc_params: dict
+    ):
+        # The cached figure of the script and the copy that was prepared
+        self.source = source
+        self.gl_figure = gl_figure
+        self.figure = gl_figure._figure
+        self.dpi = self.figure.dpi
+        self.params = params
+        # id(element) -> artists added to the axes by the element
+        self.artists = artists
+        # rc state the figure was prepared with, restored to restyle or save it
+        self.rc_params = rc_params
+        self.layout_engine = self.figure.get_layout_engine()
+        # Size in inches the layout was last computed for
+        self.layout = None
+
+    def freeze_layout(self, layout):
+        # Cosmetic changes don't move anything, so the positions computed by
+        # the layout engine are kept instead of being computed on every draw
+        if self.layout_engine is not None and self.layout is None:
+            self.figure.set_layout_engine("none")
+        self.layout = layout
+
+    def thaw_layout(self):
+        if self.layout_engine is not None and self.layout is not None:
+            self.figure.set_layout_engine(self.layout_engine)
+        self.layout = None
+
+    def elements(self, section: str):
+        if not isinstance(self.gl_figure, gl.Figure):
+            return []
+        return [
+            element
+            for element in self.gl_figure._elements
+            if type(element).__name__ == section
+        ]
+
+    def artists_of(self, element, artist_type=object):
+        return [
+            artist
+            for artist in self.artists.get(id(element), [])
+            if isinstance(artist, artist_type)
+        ]
+
+
+@contextmanager
+def capture_artists(gl_figure):
+    """
+    Record the artists added to the axes by each element of ``gl_figure``
+    while it is being prepared. Yields the dictionary filled with the
+    results, keyed by the id of the elements.
+    """
+    artists = {}
+    elements = [
+        element
+        for element in getattr(gl_figure, "_elements", [])
+        if hasattr(element, "_plot_element")
+    ]
+
+    def capturing(element, plot_element):
+        def _plot_element(axes, z_order, **kwargs):
+            before = {id(artist) for artist in axes.get_children()}
+            plot_element(axes, z_order, **kwargs)
+            artists[id(element)] = [
+                artist
+                for artist in axes.get_children()
+                if id(artist) not in before
+            ]
+
+        return _plot_element
+
+    for element in elements:
+        element._plot_element = capturing(element, element._plot_element)
+    try:
+        yield artists
+    finally:
+        for element in elements:
+            vars(element).pop("_plot_element", None)
+
+
+# Private GraphingLib attributes of a prepared figure used to restyle it
+_FIGURE_ATTRIBUTES = (
+    "_elements",
+    "_figure",
+    "_axes",
+    "_twin_x_axis",
+    "_twin_y_axis",
+    "_rc_dict",
+    "_user_rc_dict",
+    "_show_grid",
+)
+
+
+def supports_restyle(gl_figure) -> bool:
+    """
+    Whether ``gl_figure`` has the private attributes restyling relies on,
+    which other versions of GraphingLib may not have. Figures without them
+    are always prepared again.
+    """
+    if not isinstance(gl_figure, gl.Figure):
+        return False
+    if not all(hasattr(gl_figure, attribute) for attribute in _FIGURE_ATTRIBUTES):
+        return False
+    return all(hasattr(element, "_plot_element") for element in gl_figure._elements)
+
+
+def style_value(element, attribute: str, params: dict):
+    # Attributes left to "default" are filled in from the style parameters
+    value = getattr(element, attribute)
+    if isinstance(value, str) and value == "default":
+        return params[type(element).__name__][attribute]
+    return value
+
+
+def changed_params(old: dict, new: dict) -> list[tuple[str, str]]:
+    changed = []
+    for section, values in new.items():
+        old_values = old.get(section, {})
+        for key, value in values.items():
+            if key not in old_values or old_values[key] != value:
+                changed.append((section, key))
+    for section, values in old.items():
+        for key in values:
+            if key not in new.get(section, {}):
+                changed.append((section, key))
+    return changed
+
+
+def restyle(prepared: PreparedFigure, params: dict) -> bool:
+    """
+    Apply the parameters that changed since ``prepared`` was prepared to its
+    live matplotlib artists. Returns False, possibly after modifying some of
+    the artists, when a change is structural and the figure must be prepared
+    again from scratch.
+    """
+    if not supports_restyle(prepared.gl_figure):
+        return False
+    if prepared.gl_figure._twin_x_axis or prepared.gl_figure._twin_y_axis:
+        return False
+
+    changed = changed_params(prepared.params, params)
+    rc_changes = {}
+    element_changes = {}
+    for section, key in changed:
+        if key not in params.get(section, {}):
+            # Only preparing the figure again restores the default
+            return False
+        if section == "rc_params":
+            rc_changes[key] = params[section][key]
+        else:
+            element_changes.setdefault(section, set()).add(key)
+
+    refresh_legend = False
+    for key, value in rc_changes.items():
+        source = prepared.source
+        if key in source._rc_dict or key in source._user_rc_dict:
+            # Set by the script itself, the style doesn't apply
+            continue
+        if key not in RC_SETTERS:
+            return False
+        RC_SETTERS[key](prepared, value)
+        # Keep the rc state consistent with the artists for the legend and
+        # any element created later on this figure
+        plt.rcParams[key] = value
+        refresh_legend = refresh_legend or key in LEGEND_RC_PARAMS
+        if key in LAYOUT_RC_PARAMS:
+            prepared.thaw_layout()
+
+    for section, keys in element_changes.items():
+        if section == "Figure":
+            if keys - FIGURE_COSMETIC_PARAMS:
+                return False
+            continue
+        elements = [
+            element
+            for element in prepared.elements(section)
+            if any(_is_default(element, key) for key in keys)
+        ]
+        if not elements:
+            # No element of the figure is affected by these parameters
+            continue
+        if section not in ELEMENT_SETTERS:
+            return False
+        cosmetic_keys, setter = ELEMENT_SETTERS[section]
+        if keys - cosmetic_keys:
+            return False
+        for element in elements:
+            if not setter(prepared, element, params, keys):
+                return False
+            refresh_legend = refresh_legend or _has_legend_entry(element)
+
+    if refresh_legend and not _refresh_legend(prepared):
+        return False
+    prepared.params = params
+    return True
+
+
+def _is_default(element, attribute: str) -> bool:
+    value = getattr(element, attribute, None)
+    return isinstance(value, str) and value == "default"
+
+
+def _has_legend_entry(element) -> bool:
+    try:
+        return element.label is not None and element.handle is not None
+    except AttributeError:
+        return False
+
+
+def _refresh_legend(prepared: PreparedFigure) -> bool:
+    # Legend entries are copies of the artists made when the legend is created,
+    # recreate it with the same options so that it follows the new style
+    axes = prepared.gl_figure._axes
+    legend = axes.get_legend()
+    if legend is None:
+        return True
+    handles = [
+        element.handle
+        for element in prepared.gl_figure._elements
+        if _has_legend_entry(element)
+    ]
+    labels = [text.get_text() for text in legend.get_texts()]
+    if len(handles) != len(labels):
+        return False
+    axes.legend(
+        handles=handles,
+        labels=labels,
+        loc=legend._loc,
+        bbox_to_anchor=legend._bbox_to_anchor,
+        ncols=legend._ncols,
+        handleheight=legend.handleheight,
+        handler_map=legend._custom_handler_map,
+        draggable=legend.get_draggable(),
+    )
+    return True
+
+
+# rc parameters
+
+
+def _set_figure_facecolor(prepared, value):
+    prepared.figure.set_facecolor(value)
+
+
+def _set_axes_facecolor(prepared, value):
+    for axes in prepared.figure.axes:
+        axes.set_facecolor(value)
+
+
+def _set_axes_edgecolor(prepared, value):
+    for axes in prepared.figure.axes:
+        for spine in axes.spines.values():
+            spine.set_edgecolor(value)
+
+
+def _set_axes_linewidth(prepared, value):
+    for axes in prepared.figure.axes:
+        for spine in axes.spines.values():
+            spine.set_linewidth(value)
+
+
+def _set_axes_labelcolor(prepared, value):
+    for axes in prepared.figure.axes:
+        axes.xaxis.label.set_color(value)
+        axes.yaxis.label.set_color(value)
+
+
+def _set_axes_grid(prepared, value):
+    if prepared.source._show_grid == "unchanged":
+        prepared.gl_figure._axes.grid(
+            value,
+            which=plt.rcParams["axes.grid.which"],
+            axis=plt.rcParams["axes.grid.axis"],
+        )
+
+
+def _tick_params_setter(axis, **kwargs):
+    def setter(prepared, value):
+        params = {name: value for name in kwargs}
+        if "color" in params and plt.rcParams[f"{axis}tick.labelcolor"] == "inherit":
+            params["labelcolor"] = value
+        for axes in prepared.figure.axes:
+            axes.tick_params(axis=axis or "both", which="both", **params)
+
+    return setter
+
+
+def _legend_only(prepared, value):
+    # Applied when the legend is recreated
+    pass
+
+
+RC_SETTERS = {
+    "figure.facecolor": _set_figure_facecolor,
+    "axes.facecolor": _set_axes_facecolor,
+    "axes.edgecolor": _set_axes_edgecolor,
+    "axes.linewidth": _set_axes_linewidth,
+    "axes.labelcolor": _set_axes_labelcolor,
+    "axes.grid": _set_axes_grid,
+    "xtick.color": _tick_params_setter("x", color=True),
+    "ytick.color": _tick_params_setter("y", color=True),
+    "xtick.direction": _tick_params_setter("x", direction=True),
+    "ytick.direction": _tick_params_setter("y", direction=True),
+    "grid.color": _tick_params_setter("", grid_color=True),
+    "grid.linewidth": _tick_params_setter("", grid_linewidth=True),
+    "grid.linestyle": _tick_params_setter("", grid_linestyle=True),
+    "grid.alpha": _tick_params_setter("", grid_alpha=True),
+    "legend.facecolor": _legend_only,
+    "legend.edgecolor": _legend_only,
+}
+
+# The legend frame inherits these when its own colors are "inherit"
+LEGEND_RC_PARAMS = {
+    "legend.facecolor",
+    "legend.edgecolor",
+    "axes.facecolor",
+    "axes.edgecolor",
+}
+
+# Cosmetic, but they change the space taken by the axes decorations
+LAYOUT_RC_PARAMS = {
+    "axes.linewidth",
+    "xtick.direction",
+    "ytick.direction",
+}
+
+# The preview and saved sizes are set explicitly, the figure size doesn't matter
+FIGURE_COSMETIC_PARAMS = {"_size"}
+
+
+# Element parameters
+
+
+def _set_errorbars(container, color, line_width, cap_width, cap_thickness):
+    # The color is left unchanged when it is None
+    _, caplines, barlinecols = container.lines
+    for barlinecol in barlinecols:
+        if color is not None:
+            barlinecol.set_color(color)
+        barlinecol.set_linewidth(line_width)
+    for capline in caplines:
+        if color is not None:
+            capline.set_color(color)
+            capline.set_markeredgecolor(color)
+        capline.set_markersize(2 * cap_width)
+        capline.set_markeredgewidth(cap_thickness)
+
+
+def _restyle_curve(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    line, caplines, _ = element.handle.lines
+
+    color = value("_color")
+    if color is None:
+        if "_color" in keys:
+            # Back to the color cycle, which only the full preparation knows
+            return False
+        color = line.get_color()
+    line_width = value("_line_width")
+    line_style = value("_line_style")
+    line.set_color(color)
+    line.set_linewidth(line_width)
+    line.set_linestyle(line_style)
+
+    same = lambda attribute, curve_value: (
+        curve_value if value(attribute) == "same as curve" else value(attribute)
+    )
+    if element._show_errorbars:
+        _set_errorbars(
+            element.handle,
+            same("_errorbars_color", color),
+            same("_errorbars_line_width", line_width),
+            value("_cap_width"),
+            same("_cap_thickness", line_width),
+        )
+
+    fills = prepared.artists_of(element, PolyCollection)
+    if element._show_error_curves:
+        error_curves = [
+            artist
+            for artist in prepared.artists_of(element, Line2D)
+            if artist is not line and artist not in caplines
+        ]
+        for error_curve in error_curves:
+            error_curve.set_color(same("_error_curves_color", color))
+            error_curve.set_linestyle(same("_error_curves_line_style", line_style))
+            error_curve.set_linewidth(same("_error_curves_line_width", line_width))
+        if element._error_curves_fill_between and fills:
+            fills[0].set_color(color)
+    if element._fill_between_bounds and fills:
+        fills[-1].set_color(same("_fill_between_color", color))
+    return True
+
+
+def _restyle_fit(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    color = value("_color")
+    if color is None:
+        return False
+    element.handle.set_color(color)
+    element.handle.set_linewidth(value("_line_width"))
+    element.handle.set_linestyle(value("_line_style"))
+    for residual in prepared.artists_of(element, Line2D):
+        if residual is not element.handle:
+            residual.set_color(value("_res_color"))
+            residual.set_linewidth(value("_res_line_width"))
+            residual.set_linestyle(value("_res_line_style"))
+    if element._fill_between_bounds and not element._fill_between_color:
+        for fill in prepared.artists_of(element, PolyCollection):
+            fill.set_color(color)
+    return True
+
+
+def _restyle_scatter(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    colors = {"_face_color", "_edge_color", "_errorbars_color"}
+    if element._show_errorbars and keys & colors:
+        # The errorbars color can be derived from the marker colors
+        return False
+    for attribute, setter in (
+        ("_face_color", element.handle.set_facecolor),
+        ("_edge_color", element.handle.set_edgecolor),
+    ):
+        color = value(attribute)
+        if color is None:
+            setter("none")
+        elif isinstance(color, str) and color in ("color cycle", "default"):
+            if attribute in keys:
+                return False
+        elif isinstance(color, str):
+            setter(color)
+    element.handle.set_sizes([value("_marker_size")])
+    if element._show_errorbars:
+        _set_errorbars(
+            element.errorbars_handle,
+            None,
+            value("_errorbars_line_width"),
+            value("_cap_width"),
+            value("_cap_thickness"),
+        )
+    return True
+
+
+def _restyle_point(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    color = value("_color")
+    edge_color = value("_edge_color")
+    if color is None and edge_color is None:
+        return False
+    for marker in prepared.artists_of(element, PathCollection):
+        marker.set_facecolor(color if color is not None else "none")
+        marker.set_edgecolor(edge_color if edge_color is not None else "none")
+        marker.set_sizes([value("_marker_size")])
+        marker.set_linewidths(value("_edge_width"))
+    text_color = value("_text_color")
+    if text_color == "same as point":
+        text_color = edge_color if edge_color is not None else color
+    for annotation in prepared.artists_of(element, Annotation):
+        annotation.set_color(text_color)
+    return True
+
+
+def _restyle_histogram(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    face_color = to_rgba(value("_face_color"), value("_alpha"))
+    edge_color = to_rgba(value("_edge_color"), 1)
+    for patch in [element.handle] + prepared.artists_of(element, Patch):
+        patch.set_facecolor(face_color)
+        patch.set_edgecolor(edge_color)
+        patch.set_linewidth(value("_line_width"))
+    for curve in prepared.artists_of(element, Line2D):
+        curve.set_color(value("_pdf_curve_color"))
+    # The standard deviation lines are drawn before the mean line
+    lines = prepared.artists_of(element, LineCollection)
+    if element._pdf_show_mean and lines:
+        lines.pop().set_color(value("_pdf_mean_color"))
+    if element._pdf_show_std and lines:
+        lines.pop().set_color(value("_pdf_std_color"))
+    return True
+
+
+def _restyle_lines(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    for lines in prepared.artists_of(element, LineCollection):
+        lines.set_color(value("_colors"))
+        lines.set_linestyle(value("_line_styles"))
+        lines.set_linewidth(value("_line_widths"))
+    element.handle.set_color(value("_colors"))
+    element.handle.set_linestyle(value("_line_styles"))
+    return True
+
+
+def _restyle_color_map(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    # Color bars follow their mappable
+    for mappable in prepared.artists_of(element, (AxesImage, ContourSet)):
+        mappable.set_cmap(value("_color_map"))
+        if "_alpha" in keys:
+            mappable.set_alpha(value("_alpha"))
+            # Unlike set_cmap, set_alpha doesn't notify the color bar
+            mappable.changed()
+    return True
+
+
+def _restyle_vector_field(prepared, element, params, keys):
+    for quiver in prepared.artists_of(element, Quiver):
+        quiver.set_color(style_value(element, "_color", params))
+    return True
+
+
+def _restyle_stream(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    color = value("_color")
+    if not isinstance(color, str):
+        if "_color" in keys:
+            # Color cycle or speeds mapped to colors
+            return False
+        color = None
+    for artist in prepared.artists_of(element, (LineCollection, FancyArrowPatch)):
+        if color is not None:
+            artist.set_color(color)
+        artist.set_linewidth(value("_line_width"))
+    return True
+
+
+def _restyle_text(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    for text in prepared.artists_of(element, Text):
+        text.set_color(value("_color"))
+        text.set_horizontalalignment(value("_h_align"))
+        text.set_verticalalignment(value("_v_align"))
+        if isinstance(text, Annotation) and text.arrow_patch is not None:
+            text.arrow_patch.set_color(value("_color"))
+    return True
+
+
+def _restyle_arrow(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    width = value("_width")
+    for annotation in prepared.artists_of(element, Annotation):
+        annotation.arrow_patch.set_color(value("_color"))
+        annotation.arrow_patch.set_linewidth(width)
+    return True
+
+
+def _restyle_polygon(prepared, element, params, keys):
+    value = lambda attribute: style_value(element, attribute, params)
+    patches = prepared.artists_of(element, Patch)
+    fill_color = value("_fill_color")
+    edge_color = value("_edge_color")
+    has_fill = value("_fill")
+    if len(patches) != int(bool(has_fill)) + int(edge_color is not None):
+        # A patch has to be added or removed
+        return False
+    if has_fill:
+        fill = patches.pop(0)
+        if fill_color is None:
+            if "_fill_color" in keys:
+                return False
+        else:
+            fill.set_facecolor(fill_color)
+        fill.set_alpha(value("_fill_alpha"))
+    if edge_color is not None:
+        edge = patches.pop(0)
+        edge.set_edgecolor(edge_color)
+        edge.set_linewidth(value("_line_width"))
+        edge.set_linestyle(value("_line_style"))
+    return True
+
+
+_FIT_PARAMS = {
+    "_color",
+    "_line_width",
+    "_line_style",
+    "_res_color",
+    "_res_line_width",
+    "_res_line_style",
+}
+_POLYGON_PARAMS = {
+    "_fill",
+    "_fill_alpha",
+    "_fill_color",
+    "_edge_color",
+    "_line_width",
+    "_line_style",
+}
+
+# Style section -> (parameters that only change artist properties, setter)
+ELEMENT_SETTERS = {
+    "Curve": (
+        {
+            "_color",
+            "_line_width",
+            "_line_style",
+            "_cap_width",
+            "_cap_thickness",
+            "_errorbars_color",
+            "_errorbars_line_width",
+            "_error_curves_color",
+            "_error_curves_line_style",
+            "_error_curves_line_width",
+            "_fill_between_color",
+        },
+        _restyle_curve,
+    ),
+    "Scatter": (
+        {
+            "_face_color",
+            "_edge_color",
+            "_marker_size",
+            "_cap_width",
+            "_cap_thickness",
+            "_errorbars_color",
+            "_errorbars_line_width",
+        },
+        _restyle_scatter,
+    ),
+    "Point": (
+        {"_color", "_edge_color", "_marker_size", "_edge_width", "_text_color"},
+        _restyle_point,
+    ),
+    "Histogram": (
+        {
+            "_face_color",
+            "_edge_color",
+            "_alpha",
+            "_line_width",
+            "_pdf_curve_color",
+            "_pdf_mean_color",
+            "_pdf_std_color",
+        },
+        _restyle_histogram,
+    ),
+    "Hlines": ({"_colors", "_line_styles", "_line_widths"}, _restyle_lines),
+    "Vlines": ({"_colors", "_line_styles", "_line_widths"}, _restyle_lines),
+    "Heatmap": ({"_color_map"}, _restyle_color_map),
+    "Contour": ({"_color_map", "_alpha"}, _restyle_color_map),
+    "VectorField": ({"_color"}, _restyle_vector_field),
+    "Stream": ({"_color", "_line_width"}, _restyle_stream),
+    "Text": ({"_color", "_h_align", "_v_align"}, _restyle_text),
+    "Arrow": ({"_color", "_width"}, _restyle_arrow),
+    "Line": ({"_color", "_width"}, _restyle_arrow),
+    "Polygon": (_POLYGON_PARAMS, _restyle_polygon),
+    "Circle": (_POLYGON_PARAMS, _restyle_polygon),
+    "Rectangle": (_POLYGON_PARAMS, _restyle_polygon),
+    **{
+        fit: (_FIT_PARAMS, _restyle_fit)
+        for fit in (
+            "FitFromPolynomial",
+            "FitFromExponential",
+            "FitFromGaussian",
+            "FitFromSine",
+            "FitFromSquareRoot",
+            "FitFromLog",
+            "FitFromFunction",
+            "FitFromFOTF",
+        )
+    },
+}
@@ -0,0 +1,362 @@
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import traceback
+import types
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+try:
+    import resource
+except ImportError:  # Windows, only the wall-clock timeout applies
+    resource = None
+
+from .rendering import RenderError, RenderRequest, RenderResult
+
+
+class SandboxError(RenderError):
+    pass
+
+
+def _virtual_memory_size():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@contextmanager
+def _limits(cpu_time_limit, memory_limit):
+    """
+    Limit the CPU time and memory available to the current process for the
+    duration of the block. Exceeding the CPU time kills the process (SIGXCPU),
+    exceeding the memory raises a MemoryError.
+    """
+    if resource is None:
+        yield
+        return
+    old_cpu = resource.getrlimit(resource.RLIMIT_CPU)
+    old_as = resource.getrlimit(resource.RLIMIT_AS)
+    try:
+        if cpu_time_limit is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            used = int(usage.ru_utime + usage.ru_stime)
+            soft = used + max(1, int(cpu_time_limit))
+            if old_cpu[1] != resource.RLIM_INFINITY:
+                soft = min(soft, old_cpu[1])
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, old_cpu[1]))
+        vm_size = _virtual_memory_size()
+        if memory_limit is not None and vm_size is not None:
+            soft = vm_size + int(memory_limit)
+            if old_as[1] != resource.RLIM_INFINITY:
+                soft = min(soft, old_as[1])
+            resource.setrlimit(resource.RLIMIT_AS, (soft, old_as[1]))
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, old_cpu)
+        resource.setrlimit(resource.RLIMIT_AS, old_as)
+
+
+@contextmanager
+def _without_main_module():
+    # Spawned processes re-run the parent's __main__ module unless it is
+    # guarded by `if __name__ == "__main__"`, which scripts calling glse.run()
+    # rarely are. The workers only need glse, so hide __main__ while starting.
+    main_module = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main_module
+
+
+def _worker_main(conn, cpu_time_limit, memory_limit):
+    # Pre-warm the worker: everything a figure script typically needs is
+    # imported before the first render request arrives
+    import matplotlib
+
+    matplotlib.use("agg")
+    import graphinglib  # noqa: F401
+    import numpy  # noqa: F401
+
+    from .rendering import FigureRenderer
+
+    renderer = FigureRenderer()
+    shm = None
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            kind, payload = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if kind == "stop":
+            break
+
+        try:
+            with _limits(cpu_time_limit, memory_limit):
+                if kind == "render":
+                    request, shm_name = payload
+                    result = renderer.render(request)
+                    reply = {
+                        "chosen": result.chosen,
+                        "figure_names": result.figure_names,
+                        "dependencies": result.dependencies,
+                        "error": result.error,
+                        "width": result.width,
+                        "height": result.height,
+                        "pixel_ratio": result.pixel_ratio,
+                        "render_time": result.render_time,
+                        "timings": result.timings,
+                    }
+                    if result.ok:
+                        if shm is None or shm.name != shm_name:
+                            if shm is not None:
+                                shm.close()
+                            # Spawned workers share the parent's resource
+                            # tracker, which unlinks the segment when done
+                            shm = shared_memory.SharedMemory(name=shm_name)
+                        pixels = numpy.asarray(result.buffer).reshape(-1)
+                        numpy.ndarray(
+                            pixels.shape, dtype=pixels.dtype, buffer=shm.buf
+                        )[:] = pixels
+                        renderer.set_current_figure(None)
+                elif kind == "save":
+                    renderer.save(*payload)
+                    renderer.set_current_figure(None)
+                    reply = {"error": None}
+                else:
+                    reply = {"error": f"Unknown sandbox request: {kind}"}
+        except MemoryError:
+            reply = {"error": "The figure script exceeded the memory limit"}
+        except RenderError as e:
+            reply = {"error": str(e)}
+        except Exception:
+            reply = {"error": traceback.format_exc()}
+        conn.send(("result", reply))
+
+    if shm is not None:
+        shm.close()
+
+
+class SandboxWorker:
+    """
+    A single pre-warmed render process and the shared memory used to
+    transfer its rendered pixels.
+    """
+
+    def __init__(self, context, cpu_time_limit, memory_limit):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, cpu_time_limit, memory_limit),
+            daemon=True,
+        )
+        with _without_main_module():
+            self.process.start()
+        child_conn.close()
+        self.ready = False
+        self.shm = None
+
+    def wait_until_ready(self, timeout):
+        if self.ready:
+            return
+        kind, _ = self.receive(timeout)
+        if kind != "ready":
+            raise SandboxError("The sandbox process failed to start")
+        self.ready = True
+
+    def receive(self, timeout):
+        try:
+            if not self.conn.poll(timeout):
+                raise SandboxError(f"The render timed out after {timeout:g} s")
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.process.join(1)
+            exitcode = self.process.exitcode
+            if exitcode is not None and exitcode < 0:
+                if hasattr(signal, "SIGXCPU") and -exitcode == signal.SIGXCPU:
+                    raise SandboxError("The figure script exceeded the CPU time limit")
+                raise SandboxError(
+                    f"The render process crashed ({signal.Signals(-exitcode).name})"
+                )
+            raise SandboxError(f"The render process crashed (exit code {exitcode})")
+
+    def buffer(self, nbytes):
+        if self.shm is None or self.shm.size < nbytes:
+            self.release_buffer()
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        return self.shm
+
+    def release_buffer(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def call(self, kind, payload, timeout):
+        self.conn.send((kind, payload))
+        kind, reply = self.receive(timeout)
+        return reply
+
+    def stop(self):
+        try:
+            self.conn.send(("stop", None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.release_buffer()
+
+
+class SandboxPool:
+    """
+    Pool of pre-warmed processes running figure scripts with CPU time and
+    memory limits. A render that times out or crashes only costs its process,
+    which is replaced by a fresh one.
+    """
+
+    def __init__(
+        self,
+        processes: int = 2,
+        cpu_time_limit: float | None = 10,
+        memory_limit: int | None = 1024**3,
+        timeout: float | None = None,
+        startup_timeout: float = 60,
+    ):
+        self.context = multiprocessing.get_context("spawn")
+        self.cpu_time_limit = cpu_time_limit
+        self.memory_limit = memory_limit
+        self.timeout = (
+            timeout
+            if timeout is not None
+            else 2 * (cpu_time_limit if cpu_time_limit is not None else 30)
+        )
+        self.startup_timeout = startup_timeout
+        self.processes = processes
+        self.workers = []
+        # Workers are replaced from the threads rendering with them
+        self.lock = threading.Lock()
+        self.idle = queue.Queue()
+        for _ in range(processes):
+            self.idle.put(self._spawn())
+
+    def _spawn(self):
+        try:
+            worker = SandboxWorker(
+                self.context, self.cpu_time_limit, self.memory_limit
+            )
+        except Exception as e:
+            raise SandboxError(f"The sandbox process could not be started: {e}")
+        with self.lock:
+            self.workers.append(worker)
+        return worker
+
+    def _discard(self, worker):
+        worker.kill()
+        with self.lock:
+            if worker in self.workers:
+                self.workers.remove(worker)
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            missing = len(self.workers) < self.processes
+        if missing:
+            # Workers whose replacement couldn't be started are started again
+            return self._spawn()
+        try:
+            # Busy workers are done by then, or killed and replaced
+            return self.idle.get(timeout=self.startup_timeout + self.timeout)
+        except queue.Empty:
+            raise SandboxError("No sandbox process became available") from None
+
+    def _call(self, kind, payload_factory, read_reply=None):
+        """
+        Send a request to an idle worker and return its reply. ``read_reply``
+        is called with the worker and the reply before the worker is given
+        to another request. Failures of the sandbox are returned as an error
+        reply, the worker that failed is replaced.
+        """
+        worker = None
+        try:
+            worker = self._acquire()
+            worker.wait_until_ready(self.startup_timeout)
+            reply = worker.call(kind, payload_factory(worker), self.timeout)
+            if read_reply is not None:
+                read_reply(worker, reply)
+        except SandboxError as e:
+            if worker is not None:
+                self._discard(worker)
+                try:
+                    self.idle.put(self._spawn())
+                except SandboxError:
+                    # Started again by a later request
+                    pass
+            return {"error": str(e)}
+        except BaseException:
+            if worker is not None:
+                self.idle.put(worker)
+            raise
+        self.idle.put(worker)
+        return reply
+
+    def render(self, request: RenderRequest, superseded=None) -> RenderResult:
+        nbytes = max(1, request.width * request.height * 4)
+
+        def read_pixels(worker, reply):
+            if reply.get("error") is None and reply.get("width"):
+                # Copy the pixels out, the worker reuses its buffer
+                size = reply["width"] * reply["height"] * 4
+                reply["buffer"] = bytes(worker.shm.buf[:size])
+
+        try:
+            reply = self._call(
+                "render",
+                lambda worker: (request, worker.buffer(nbytes).name),
+                read_pixels,
+            )
+        except Exception:
+            # Rendering runs in a slot, an exception would leave the preview
+            # without a result
+            reply = {"error": traceback.format_exc()}
+        result = RenderResult(request)
+        result.error = reply.get("error")
+        result.chosen = reply.get("chosen", request.chosen)
+        result.figure_names = reply.get("figure_names", [])
+        result.dependencies = reply.get("dependencies", {})
+        if result.error is None and reply.get("width"):
+            result.width = reply["width"]
+            result.height = reply["height"]
+            result.pixel_ratio = reply["pixel_ratio"]
+            result.render_time = reply["render_time"]
+            result.timings = reply["timings"]
+            result.buffer = reply["buffer"]
+        return result
+
+    def save(self, request: RenderRequest, filepath, format, width, height, dpi):
+        reply = self._call(
+            "save", lambda worker: (request, filepath, format, width, height, dpi)
+        )
+        if reply.get("error"):
+            raise SandboxError(reply["error"])
+
+    def shutdown(self):
+        with self.lock:
+            self.processes = 0
+            workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,85 @@
+import time
+
+from PySide6.QtCore import QObject, QTimer
+
+
+class RenderScheduler(QObject):
+    """
+    Coalesces render requests so that the figure is rendered at most once per
+    frame interval. Only the newest pending state is kept (latest wins).
+    """
+
+    def __init__(self, render_callback, max_fps: float = 30, parent=None):
+        super().__init__(parent)
+        self.render_callback = render_callback
+        self.max_fps = max_fps
+
+        self.pending = None
+        self.has_pending = False
+        self.last_render_end = 0.0
+
+        # Statistics
+        self.requested = 0
+        self.rendered = 0
+        self.coalesced = 0
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    @property
+    def max_fps(self) -> float:
+        return self._max_fps
+
+    @max_fps.setter
+    def max_fps(self, value: float):
+        if value <= 0:
+            raise ValueError("max_fps must be strictly positive")
+        self._max_fps = value
+
+    @property
+    def frame_interval(self) -> float:
+        return 1 / self._max_fps
+
+    def request(self, params):
+        # A request that replaces one that was never rendered is dropped
+        if self.has_pending:
+            self.coalesced += 1
+        self.pending = params
+        self.has_pending = True
+        self.requested += 1
+
+        if not self.timer.isActive():
+            # Leave at least one frame interval between the end of the last
+            # render and the start of the next one so the UI stays responsive
+            elapsed = time.monotonic() - self.last_render_end
+            delay = max(0.0, self.frame_interval - elapsed)
+            self.timer.start(int(delay * 1000))
+
+    def flush(self):
+        self.timer.stop()
+        if not self.has_pending:
+            return
+        params = self.pending
+        self.pending = None
+        self.has_pending = False
+        try:
+            self.render_callback(params)
+        finally:
+            self.rendered += 1
+            self.last_render_end = time.monotonic()
+
+    def cancel(self):
+        self.timer.stop()
+        if self.has_pending:
+            self.coalesced += 1
+        self.pending = None
+        self.has_pending = False
+
+    def stats(self) -> dict:
+        return {
+            "requested": self.requested,
+            "rendered": self.rendered,
+            "coalesced": self.coalesced,
+            "max_fps": self.max_fps,
+        }
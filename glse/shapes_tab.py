@@ -1,7 +1,7 @@
 from PySide6.QtCore import Qt
-from PySide6.QtWidgets import QScrollArea, QTabWidget, QVBoxLayout, QWidget
+from PySide6.QtWidgets import QTabWidget, QVBoxLayout
 
-from .widgets import Activator, CheckBox, ColorPickerWidget, Dropdown, Slider
+from .widgets import Activator, CheckBox, ColorPickerWidget, Dropdown, LazyTab, Slider
 
 
 def create_shapes_tab(window):
@@ -9,34 +9,13 @@ def create_shapes_tab(window):
     tabWidget = QTabWidget()
 
     # polygon tab
-    polygonTabLayout = create_polygon_tab(window)
-    polygonTab = QWidget()
-    polygonTab.setLayout(polygonTabLayout)
-    polygonTabScrollArea = QScrollArea()
-    polygonTabScrollArea.setWidgetResizable(True)
-    polygonTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    polygonTabScrollArea.setWidget(polygonTab)
-    tabWidget.addTab(polygonTabScrollArea, "Polygon")
+    tabWidget.addTab(LazyTab(window, create_polygon_tab), "Polygon")
 
     # create arrow tab
-    arrowTabLayout = create_arrow_tab(window)
-    arrowTab = QWidget()
-    arrowTab.setLayout(arrowTabLayout)
-    arrowTabScrollArea = QScrollArea()
-    arrowTabScrollArea.setWidgetResizable(True)
-    arrowTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    arrowTabScrollArea.setWidget(arrowTab)
-    tabWidget.addTab(arrowTabScrollArea, "Arrow")
+    tabWidget.addTab(LazyTab(window, create_arrow_tab), "Arrow")
 
     # create line tab
-    lineTabLayout = create_line_tab(window)
-    lineTab = QWidget()
-    lineTab.setLayout(lineTabLayout)
-    lineTabScrollArea = QScrollArea()
-    lineTabScrollArea.setWidgetResizable(True)
-    lineTabScrollArea.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-    lineTabScrollArea.setWidget(lineTab)
-    tabWidget.addTab(lineTabScrollArea, "Line")
+    tabWidget.addTab(LazyTab(window, create_line_tab), "Line")
 
     layout.addWidget(tabWidget)
     window.shapesTab.setLayout(layout)
@@ -100,6 +79,7 @@ def create_polygon_tab(window):
         activated_on_init=(
             False if window.params["Polygon"]["_fill_color"] is None else True
         ),
+        fallback_color="grey",
     )
     color_picker_widget = Activator(
         window,
@@ -124,6 +104,7 @@ def create_polygon_tab(window):
         activated_on_init=(
             False if window.params["Polygon"]["_edge_color"] is None else True
         ),
+        fallback_color="black",
     )
     edge_color_picker_widget = Activator(
         window,
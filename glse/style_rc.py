@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import matplotlib as mpl
+
+# matplotlib's rcParams are global, renders in the same process take turns
+rc_lock = threading.RLock()
+
+_compiled_styles = OrderedDict()
+_max_compiled_styles = 16
+
+
+def snapshot_rc() -> dict:
+    # Raw copy of the current state, without going through validation
+    rc = dict(dict.items(mpl.rcParams))
+    # The backend is not part of a style, switching it has side effects
+    rc.pop("backend", None)
+    return rc
+
+
+def apply_rc(rc: dict):
+    """
+    Set already validated rc parameters without validating them again.
+    """
+    update_raw = getattr(mpl.rcParams, "_update_raw", None)
+    if update_raw is not None:
+        update_raw(rc)
+    else:  # matplotlib < 3.10
+        dict.update(mpl.rcParams, rc)
+
+
+def style_rc(params: dict) -> dict:
+    """
+    Return the complete rc state of a style: the matplotlib defaults updated
+    with the ``rc_params`` section of ``params``. The result is validated once
+    and kept for the next renders with the same rc parameters.
+    """
+    rc_params = params.get("rc_params", {})
+    key = tuple(sorted((name, repr(value)) for name, value in rc_params.items()))
+    rc = _compiled_styles.get(key)
+    if rc is None:
+        style = mpl.rcParamsDefault.copy()
+        style.update(rc_params)
+        rc = dict(dict.items(style))
+        rc.pop("backend", None)
+        _compiled_styles[key] = rc
+        if len(_compiled_styles) > _max_compiled_styles:
+            _compiled_styles.popitem(last=False)
+    else:
+        _compiled_styles.move_to_end(key)
+    return rc
+
+
+@contextmanager
+def scoped_rc(rc: dict):
+    """
+    Apply the rc state ``rc`` for the duration of the block. Any rc parameter
+    modified inside the block, by the figure script or GraphingLib, is
+    restored when it exits.
+    """
+    with rc_lock:
+        original = snapshot_rc()
+        apply_rc(rc)
+        try:
+            yield
+        finally:
+            apply_rc(original)
+
+
+def is_valid_rc(key: str, value) -> bool:
+    # Validate without touching the global state, which may be in use by a
+    # render on another thread
+    try:
+        mpl.rcParams.validate[key](value)
+    except (ValueError, KeyError, TypeError):
+        return False
+    return True
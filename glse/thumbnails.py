@@ -0,0 +1,123 @@
+import threading
+from collections import deque
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal, Slot
+
+from .preview_cache import PreviewCache
+from .rendering import FigureRenderer, RenderRequest
+
+
+class ThumbnailWorker(QObject):
+    """
+    Renders thumbnails on a background thread. A thumbnail being rendered is
+    abandoned as soon as ``preempted`` is set, to leave the figure renderer
+    to the preview.
+    """
+
+    finished = Signal(object)
+
+    def __init__(self, renderer: FigureRenderer):
+        super().__init__()
+        self.renderer = renderer
+        self.preempted = threading.Event()
+
+    @Slot(object)
+    def render(self, request: RenderRequest):
+        result = self.renderer.render(request, superseded=self.preempted.is_set)
+        self.finished.emit(result)
+
+
+class ThumbnailRenderer(QObject):
+    """
+    Renders thumbnails of a list of figures one at a time, on a low priority
+    thread and only while ``is_busy`` returns False, so that they never delay
+    the preview.
+    """
+
+    thumbnailReady = Signal(object)
+    requested = Signal(object)
+
+    def __init__(
+        self,
+        renderer: FigureRenderer,
+        is_busy,
+        cache: PreviewCache | None = None,
+        retry_interval: int = 100,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.is_busy = is_busy
+        self.cache = cache
+        self.generation = 0
+        self.queue = deque()
+        self.in_flight = None
+
+        self.worker = ThumbnailWorker(renderer)
+        self.thread = QThread(self)
+        self.worker.moveToThread(self.thread)
+        self.worker.finished.connect(self.on_finished)
+        self.requested.connect(self.worker.render)
+        self.thread.start(QThread.LowestPriority)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(retry_interval)
+        self.timer.timeout.connect(self.render_next)
+
+    def start(self, requests: list[RenderRequest]):
+        """
+        Replace the pending thumbnails with ``requests``.
+        """
+        self.generation += 1
+        for request in requests:
+            request.generation = self.generation
+        self.queue = deque(requests)
+        self.render_next()
+
+    def cancel(self):
+        self.generation += 1
+        self.queue.clear()
+        self.timer.stop()
+
+    def preempt(self):
+        # The thumbnail being rendered is put back in the queue
+        if self.in_flight is not None:
+            self.worker.preempted.set()
+
+    def render_next(self):
+        if self.in_flight is not None or not self.queue:
+            return
+        if self.is_busy():
+            self.timer.start()
+            return
+        request = self.queue.popleft()
+        cached = self.cache.get(request) if self.cache is not None else None
+        if cached is not None:
+            self.thumbnailReady.emit(cached)
+            QTimer.singleShot(0, self.render_next)
+            return
+        self.in_flight = request
+        self.worker.preempted.clear()
+        self.requested.emit(request)
+
+    def on_finished(self, result):
+        request = self.in_flight
+        self.in_flight = None
+        if result.generation == self.generation:
+            if result.ok:
+                if self.cache is not None:
+                    self.cache.put(result)
+                # Only the pixels are kept, not the figure they come from
+                result.figure = None
+                self.thumbnailReady.emit(result)
+            elif result.error is None and self.worker.preempted.is_set():
+                # Try again once the preview is idle, other unfinished renders
+                # would only stop early again
+                self.queue.appendleft(request)
+        self.timer.start()
+
+    def stop(self):
+        self.cancel()
+        self.worker.preempted.set()
+        self.thread.quit()
+        self.thread.wait()
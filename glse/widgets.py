@@ -1,9 +1,9 @@
 from typing import Optional
 
-import matplotlib as mpl
 from matplotlib.colors import is_color_like, to_hex
 from cycler import cycler
 from PySide6.QtCore import (
+    QSignalBlocker,
     QSortFilterProxyModel,
     QStringListModel,
     Qt,
@@ -26,6 +26,7 @@ from PySide6.QtWidgets import (
     QListWidgetItem,
     QMainWindow,
     QPushButton,
+    QScrollArea,
     QSlider,
     QTableWidget,
     QTableWidgetItem,
@@ -34,6 +35,8 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from .style_rc import is_valid_rc
+
 
 class ColorButton(QPushButton):
     colorChanged = Signal(str)
@@ -84,9 +87,13 @@ class ColorPickerWidget(QWidget):
         initial_color="#ff0000",
         param_ids=[],
         activated_on_init=True,
+        fallback_color=None,
     ):
         super().__init__()
         self.the_window = window
+        # Shown instead of values that aren't colors, e.g. None for the color
+        # cycle, both when the tab is built and when it is rebound
+        self.fallback_color = fallback_color
         self.param_sections = param_ids[0]
         self.param_labels = param_ids[1]
         self.first_param_section = (
@@ -127,6 +134,17 @@ class ColorPickerWidget(QWidget):
         self.layout.addWidget(self.pasteButton)
         self.updating = False
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        color = params[self.first_param_section][self.first_param_label]
+        if not (isinstance(color, str) and color != "none" and is_color_like(color)):
+            color = self.fallback_color
+        if color is not None:
+            with QSignalBlocker(self.colorButton), QSignalBlocker(self.colorEdit):
+                self.colorButton.setColor(color)
+                self.colorEdit.setText(color)
+
     def onColorChanged(self, color):
         if not self.updating:
             self.updating = True
@@ -204,6 +222,15 @@ class Activator(QWidget):
         self.layout.addWidget(widget)
         self.layout.addWidget(self.checkbox)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        value = params[self.first_param_section][self.first_param_label]
+        is_checked = value == self.param_if_checked
+        with QSignalBlocker(self.checkbox):
+            self.checkbox.setChecked(is_checked)
+        self.widget.setEnabled(not is_checked)
+
     def onStateChanged(self, state):
         self.widget.setEnabled(True if state != 2 else False)
         if state == 2:
@@ -272,6 +299,18 @@ class ActivatorDropdown(QWidget):
         self.layout.addWidget(widget)
         self.layout.addWidget(self.dropdown)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        value = params[self.first_param_section][self.first_param_label]
+        if value in self.params_if_inactive:
+            index = self.params_if_inactive.index(value) + 1
+        else:
+            index = 0
+        with QSignalBlocker(self.dropdown):
+            self.dropdown.setCurrentIndex(index)
+        self.widget.setEnabled(index == 0)
+
     def onCurrentIndexChanged(self, index):
         self.widget.setEnabled(index == 0)
         if index == 0:
@@ -350,6 +389,17 @@ class Slider(QWidget):
         self.layout.addWidget(self.slider)
         self.layout.addWidget(self.line_edit)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        value = params[self.first_param_section][self.first_param_label]
+        is_number = not isinstance(value, str)
+        value = value if is_number else 0
+        with QSignalBlocker(self.slider):
+            self.slider.setValue(int(value * self.factor))
+        self.line_edit.setText(str(value))
+        self.setEnabled(is_number)
+
     def onValueChanged(self, value):
         new_value = value / self.factor
         # turn into int if it's a whole number
@@ -434,6 +484,21 @@ class Dropdown(QWidget):
         self.layout.addWidget(self.label)
         self.layout.addWidget(self.dropdown)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        value = params[self.first_param_section][self.first_param_label]
+        is_same_as = isinstance(value, str) and "same as" in value
+        if is_same_as:
+            index = 0
+        elif value in self.param_values:
+            index = self.param_values.index(value)
+        else:
+            index = self.dropdown.currentIndex()
+        with QSignalBlocker(self.dropdown):
+            self.dropdown.setCurrentIndex(index)
+        self.setEnabled(not is_same_as)
+
     def getValue(self):
         return self.dropdown.currentIndex()
 
@@ -468,6 +533,14 @@ class CheckBox(QWidget):
         self.layout = QHBoxLayout(self)  # type: ignore
         self.layout.addWidget(self.checkbox)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        with QSignalBlocker(self.checkbox):
+            self.checkbox.setChecked(
+                params[self.first_param_section][self.first_param_label]
+            )
+
     def onStateChanged(self, state):
         value = True if state == 2 else False
         self.the_window.update_params(self.param_sections, self.param_labels, value)
@@ -503,6 +576,13 @@ class IntegerBox(QWidget):
         self.layout.addWidget(self.label)
         self.layout.addWidget(self.spinbox)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        value = params[self.first_param_section][self.first_param_label]
+        with QSignalBlocker(self.spinbox):
+            self.spinbox.setValue(0 if isinstance(value, str) else int(value))
+
     def onValueChanged(self, value):
         self.the_window.update_params(self.param_sections, self.param_labels, value)
 
@@ -550,6 +630,18 @@ class ListOptions(QWidget):
         # Connect the listView selection change to handle selection
         self.listView.selectionModel().selectionChanged.connect(self.onSelectionChanged)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        # Like a new list, the options are shown without a selection
+        selection = self.listView.selectionModel()
+        with QSignalBlocker(selection), QSignalBlocker(self.filterLineEdit):
+            self.filterLineEdit.clear()
+            self.proxyModel.setFilterFixedString("")
+            selection.clearSelection()
+        # The view isn't notified while the selection model is blocked
+        self.listView.viewport().update()
+
     def onSelectionChanged(self, selected, deselected):
         # Assuming the parameter needs the text of the selected option
         selectedIndexes = self.listView.selectedIndexes()
@@ -751,11 +843,25 @@ class TableWidget(QWidget):
         self.timer.start(100)
 
         valid_data = self.getTableData()
-        self.the_window.update_rc_params_from_table(valid_data, init=True)
+        self.the_window.update_rc_params_from_table(valid_data)
         self.table.itemChanged.connect(self.onTableItemChanged)
 
         self.addLegend()
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        self.initial_dict = {
+            k: str(v)
+            for k, v in params["rc_params"].items()
+            if k not in self.handled_by_gui
+        }
+        with QSignalBlocker(self.table):
+            self.table.setRowCount(0)
+            self.populateTable()
+        self.updateTableHeight()
+        self.the_window.update_rc_params_from_table(self.getTableData())
+
     def addLegend(self):
         legend_layout = QHBoxLayout()
         valid_icon = self.create_indicator_icon("Valid")
@@ -853,14 +959,7 @@ class TableWidget(QWidget):
         statusItem = self.table.item(row, 2)
 
         is_valid = False
-        try:
-            # get original value
-            original_value = mpl.rcParams[key]
-            # try to set the value to see if it's valid
-            mpl.rcParams[key] = value
-            # reset the value to the original value
-            mpl.rcParams[key] = original_value
-        except (ValueError, KeyError, TypeError):
+        if not is_valid_rc(key, value):
             icon = self.create_indicator_icon("Invalid Value")
             statusItem.setIcon(icon)
             statusItem.setData(Qt.UserRole, "Invalid Value")
@@ -911,6 +1010,13 @@ class TableWidget(QWidget):
         return QIcon(pixmap)
 
 
+def cycle_colors(cycle) -> list[str]:
+    # Styles store the cycle as a string, the editor sets a cycler
+    if isinstance(cycle, str):
+        return cycle.split("[")[1].split("]")[0].replace("'", "").split(", ")
+    return list(cycle.by_key()["color"])
+
+
 class ColorCycleWidget(QWidget):
     colorsUpdated = Signal(list)
 
@@ -935,6 +1041,16 @@ class ColorCycleWidget(QWidget):
 
         self.colorsUpdated.connect(self.update_window_params)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        with QSignalBlocker(self):
+            for color_widget in list(self.color_widgets):
+                self.remove_color_widget(color_widget)
+            colors = cycle_colors(params["rc_params"]["axes.prop_cycle"])
+            for index, color in enumerate(colors):
+                self.add_color_widget(color, index)
+
     def add_color_widget(self, color="#000000", index=0):
         color_widget = ColorPickerForCycleWidget(
             self, initial_color=color, param_ids=[[], []], label=f"Color {index + 1}:"
@@ -1082,6 +1198,14 @@ class TupleWidget(QWidget):
             self.line_edits.append(line_edit)
             self.layout.addWidget(line_edit)
 
+        self.the_window.widget_registry.register(self)
+
+    def rebind(self, params: dict):
+        values = params[self.first_param_section][self.first_param_label]
+        for line_edit, value in zip(self.line_edits, values):
+            with QSignalBlocker(line_edit):
+                line_edit.setText(str(value))
+
     def onTextChanged(self):
         values = []
         for line_edit in self.line_edits:
@@ -1104,3 +1228,54 @@ class TupleWidget(QWidget):
             except ValueError:
                 values.append(None)  # or handle invalid input as needed
         return values if None not in values else []
+
+
+class LazyTab(QScrollArea):
+    """
+    Scrollable tab page whose content is created by ``create_layout(window)``
+    the first time the page is shown, from the parameters at that time.
+    """
+
+    def __init__(self, window: QMainWindow, create_layout):
+        super().__init__()
+        self.the_window = window
+        self.create_layout = create_layout
+        self.content = None
+        self.setWidgetResizable(True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+
+    def is_built(self) -> bool:
+        return self.content is not None
+
+    def build(self):
+        if self.content is None:
+            self.content = QWidget()
+            # Creating the widgets doesn't render the figure, unless they
+            # change the parameters
+            with self.the_window.batch():
+                self.content.setLayout(self.create_layout(self.the_window))
+            self.setWidget(self.content)
+
+    def showEvent(self, event):
+        self.build()
+        super().showEvent(event)
+
+
+class WidgetRegistry:
+    """
+    Widgets bound to style parameters, in creation order. Rebinding them
+    shows the values of other parameters without creating them again and
+    without updating the parameters in return.
+    """
+
+    def __init__(self):
+        self.widgets = []
+
+    def register(self, widget):
+        self.widgets.append(widget)
+
+    def rebind(self, params: dict):
+        # Wrapped widgets are registered before their Activator, which then
+        # decides whether they are enabled
+        for widget in self.widgets:
+            widget.rebind(params)